@@ -97,6 +97,27 @@ else:
         }
     }
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# Use Redis in Docker so web and Celery processes share one cache,
+# per-process local memory for local development
+CACHE_URL = os.environ.get('CACHE_URL', '')
+
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -144,6 +165,10 @@ FILE_UPLOAD_MAX_MEMORY_SIZE = 100 * 1024 * 1024  # 100MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 200 * 1024 * 1024  # 200MB
 FILE_UPLOAD_TEMP_DIR = BASE_DIR / 'temp'
 
+# Processes the legacy synchronous upload view may fork per request to parse
+# files; it runs inside a gunicorn worker, so keep it small (1 = serial)
+LEGACY_PARSE_MAX_WORKERS = int(os.environ.get('LEGACY_PARSE_MAX_WORKERS', '2'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -160,3 +185,10 @@ CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
+CELERY_BEAT_SCHEDULE = {
+    # Jobs submitted while the broker was down wait as PENDING_LOCAL
+    'requeue-pending-local-jobs': {
+        'task': 'reports.tasks.requeue_pending_local_jobs',
+        'schedule': 60.0,
+    },
+}
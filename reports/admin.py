@@ -23,6 +23,7 @@ class UploadBatchAdmin(admin.ModelAdmin):
 @admin.register(ParseError)
 class ParseErrorAdmin(admin.ModelAdmin):
     list_display = ['file_name', 'job', 'batch', 'created_at']
+    list_select_related = ('job', 'batch')
     list_filter = ['created_at']
     search_fields = ['file_name', 'error_message']
     readonly_fields = ['created_at']
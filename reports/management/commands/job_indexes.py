@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from reports.services.indexes import create_deferrable_indexes, drop_deferrable_indexes
+
+
+class Command(BaseCommand):
+    help = (
+        "Drop or rebuild non-critical ParsingJob indexes around a bulk load "
+        "(PostgreSQL only; uses CONCURRENTLY so the table stays writable)."
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['drop', 'create'])
+    
+    def handle(self, *args, **options):
+        if options['action'] == 'drop':
+            names = drop_deferrable_indexes()
+            verb = 'Dropped'
+        else:
+            names = create_deferrable_indexes()
+            verb = 'Created'
+        
+        if names:
+            self.stdout.write(self.style.SUCCESS(f"{verb}: {', '.join(names)}"))
+        else:
+            self.stdout.write("Nothing to do (already applied, or not running on PostgreSQL)")
@@ -0,0 +1,28 @@
+# Generated manually for ParseError admin search indexes
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+from reports.operations import PostgresRunSQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0003_rename_reports_par_created_d3a46f_idx_reports_par_created_e20561_idx_and_more'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        # Database-only: kept out of ParseError.Meta.indexes (see reports.operations.PostgresRunSQL)
+        PostgresRunSQL(
+            sql='CREATE INDEX IF NOT EXISTS "reports_parseerror_fname_trgm" '
+                'ON "reports_parseerror" USING gin ((UPPER("file_name")) gin_trgm_ops)',
+            reverse_sql='DROP INDEX IF EXISTS "reports_parseerror_fname_trgm"',
+        ),
+        PostgresRunSQL(
+            sql='CREATE INDEX IF NOT EXISTS "reports_parseerror_msg_trgm" '
+                'ON "reports_parseerror" USING gin ((UPPER("error_message")) gin_trgm_ops)',
+            reverse_sql='DROP INDEX IF EXISTS "reports_parseerror_msg_trgm"',
+        ),
+    ]
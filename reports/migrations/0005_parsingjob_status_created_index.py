@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-14 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0004_parseerror_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='parsingjob',
+            name='reports_par_status_67a9f3_idx',
+        ),
+        migrations.AddIndex(
+            model_name='parsingjob',
+            index=models.Index(fields=['status', '-created_at'], name='reports_par_status_created_idx'),
+        ),
+    ]
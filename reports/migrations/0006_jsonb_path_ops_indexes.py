@@ -0,0 +1,26 @@
+# Generated manually for JSON containment lookups
+
+from django.db import migrations
+
+from reports.operations import PostgresRunSQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0005_parsingjob_status_created_index'),
+    ]
+
+    operations = [
+        # Database-only: kept out of Meta.indexes (see reports.operations.PostgresRunSQL)
+        PostgresRunSQL(
+            sql='CREATE INDEX IF NOT EXISTS "parsingjob_files_gin" '
+                'ON "reports_parsingjob" USING gin ("uploaded_files" jsonb_path_ops)',
+            reverse_sql='DROP INDEX IF EXISTS "parsingjob_files_gin"',
+        ),
+        PostgresRunSQL(
+            sql='CREATE INDEX IF NOT EXISTS "parseerror_encodings_gin" '
+                'ON "reports_parseerror" USING gin ("encodings_tried" jsonb_path_ops)',
+            reverse_sql='DROP INDEX IF EXISTS "parseerror_encodings_gin"',
+        ),
+    ]
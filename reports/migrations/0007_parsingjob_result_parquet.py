@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-14 18:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0006_jsonb_path_ops_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='parsingjob',
+            name='result_parquet',
+            field=models.FileField(blank=True, max_length=500, null=True, upload_to='results/'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-14 23:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0007_parsingjob_result_parquet'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='parsingjob',
+            name='input_paths',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AlterField(
+            model_name='parsingjob',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('PENDING_LOCAL', 'Waiting for queue'), ('PROCESSING', 'Processing'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='PENDING', max_length=20),
+        ),
+    ]
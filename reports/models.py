@@ -7,6 +7,7 @@ class ParsingJob(models.Model):
     """Track async parsing jobs"""
     STATUS_CHOICES = [
         ('PENDING', 'Pending'),
+        ('PENDING_LOCAL', 'Waiting for queue'),  # Broker was down at submit; requeued by beat
         ('PROCESSING', 'Processing'),
         ('COMPLETED', 'Completed'),
         ('FAILED', 'Failed'),
@@ -21,10 +22,12 @@ class ParsingJob(models.Model):
     
     # Input files
     uploaded_files = models.JSONField(default=list)  # List of file names
+    input_paths = models.JSONField(default=list, blank=True)  # Saved upload paths, for requeueing PENDING_LOCAL jobs
     
     # Results
     result_excel = models.FileField(upload_to='results/', max_length=500, null=True, blank=True)
     result_csv = models.FileField(upload_to='results/', max_length=500, null=True, blank=True)
+    result_parquet = models.FileField(upload_to='results/', max_length=500, null=True, blank=True)  # Deduplicated drives, for regenerating exports
     total_files = models.IntegerField(default=0)
     total_drives = models.IntegerField(default=0)
     duplicates_removed = models.IntegerField(default=0)
@@ -36,8 +39,11 @@ class ParsingJob(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['-created_at']),
-            models.Index(fields=['status']),
+            # Leading status column also answers status-only filters
+            models.Index(fields=['status', '-created_at'], name='reports_par_status_created_idx'),
         ]
+        # GIN jsonb_path_ops index on uploaded_files (containment, @>) lives in
+        # migration 0006 as database-only SQL; see reports.operations.PostgresRunSQL
     
     def __str__(self):
         return f"Job {self.id} - {self.status}"
@@ -65,4 +71,9 @@ class ParseError(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        # PostgreSQL-only indexes live in migrations as database-only SQL, not
+        # in Meta.indexes: SQLite table rebuilds recreate every declared index.
+        #  - 0004: trigram GIN on UPPER(file_name), UPPER(error_message) for
+        #    admin search (icontains -> UPPER(col) LIKE ...)
+        #  - 0006: GIN jsonb_path_ops on encodings_tried for containment (@>)
\ No newline at end of file
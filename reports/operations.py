@@ -0,0 +1,26 @@
+from django.db.migrations.operations import RunSQL
+
+
+class PostgresOnlyMixin:
+    """
+    Apply a schema operation only on PostgreSQL.
+    SQLite development databases skip the DDL.
+    """
+    
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        super().database_forwards(app_label, schema_editor, from_state, to_state)
+    
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class PostgresRunSQL(PostgresOnlyMixin, RunSQL):
+    """
+    RunSQL for PostgreSQL-specific indexes (GIN, trigram opclasses).
+    The indexes never enter migration state, so SQLite table rebuilds
+    do not try to recreate them.
+    """
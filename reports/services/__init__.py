@@ -1,15 +1,20 @@
-from .collector import FileCollector
+from .collector import FileCollector, bulk_save_errors, save_upload
 from .excel import ExcelWriter
 from .encoding import try_encodings
 from .vendor import derive_vendor
-from .parsers import HTMLParser, TXTParser, PDFParser
+from .indexes import deferred_indexes
+from .parsers import HTMLParser, TXTParser, PDFParser, parse_many
 
 __all__ = [
     'FileCollector',
+    'bulk_save_errors',
+    'save_upload',
     'ExcelWriter', 
     'try_encodings',
     'derive_vendor',
+    'deferred_indexes',
     'HTMLParser',
     'TXTParser',
-    'PDFParser'
+    'PDFParser',
+    'parse_many'
 ]
@@ -1,13 +1,36 @@
+import io
 import os
+import re
+import codecs
+import csv
+import json
+import shutil
 import zipfile
 import tempfile
 import logging
-from pathlib import Path
-from typing import List, Tuple, Dict, Any
-import magic
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Dict, Any, Union
+import pandas as pd
+from django.conf import settings
+from django.core.files.move import file_move_safe
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.db import connection, transaction
+from django.utils import timezone
+
+from ..models import ParseError
 
 logger = logging.getLogger(__name__)
 
+# Local file header / empty archive magic numbers
+ZIP_SIGNATURES = (b'PK\x03\x04', b'PK\x05\x06')
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Header signatures, compiled once and matched in a single scan of the first
+# bytes: a leading %PDF or '<' at the start, otherwise an <html tag anywhere.
+_HEADER_SIGNATURES = re.compile(rb'\A\s*(?:(?P<pdf>%PDF)|(?P<markup><))|(?P<html><html)', re.IGNORECASE)
+_SIGNATURE_TYPES = {'pdf': '.pdf', 'markup': '.html', 'html': '.html'}
+_UTF16_BOMS = (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)
+
 
 class FileCollector:
     """Handles file collection, validation, and extraction"""
@@ -16,12 +39,14 @@ class FileCollector:
         self.max_single_file_size = 100 * 1024 * 1024  # 100MB
         self.max_total_size = 200 * 1024 * 1024  # 200MB
         self.max_files = 50
+        self.max_workers = 8  # Threads used to save and extract uploads
         self.supported_extensions = {'.html', '.txt', '.pdf'}
     
-    def collect_files(self, uploaded_files: List, temp_dir: str) -> Tuple[List[str], List[Dict[str, Any]]]:
+    def collect_files(self, uploaded_files: List, temp_dir: str) -> Tuple[List[Tuple[str, str]], List[Dict[str, Any]]]:
         """
         Collect and validate uploaded files.
-        Returns (file_paths, errors)
+        Returns ([(file_path, file_type), ...], errors); file_type is the
+        extension the file was recognised as, which may differ from its name's.
         """
         errors = []
         collected_files = []
@@ -31,43 +56,25 @@ class FileCollector:
         extract_dir = os.path.join(temp_dir, 'extracted')
         os.makedirs(extract_dir, exist_ok=True)
         
-        for uploaded_file in uploaded_files:
-            try:
-                # Check single file size
-                if uploaded_file.size > self.max_single_file_size:
-                    errors.append({
-                        'file_name': uploaded_file.name,
-                        'error_message': f'File size {uploaded_file.size / (1024*1024):.1f}MB exceeds limit of 100MB',
-                        'encodings_tried': []
-                    })
-                    continue
-                
-                total_size += uploaded_file.size
-                
-                # Save uploaded file to temp directory
-                temp_file_path = os.path.join(temp_dir, uploaded_file.name)
-                with open(temp_file_path, 'wb') as f:
-                    for chunk in uploaded_file.chunks():
-                        f.write(chunk)
-                
-                # Check if it's a zip file
-                if self._is_zip_file(temp_file_path):
-                    extracted_files = self._extract_zip(temp_file_path, extract_dir)
-                    collected_files.extend(extracted_files)
-                else:
-                    # Check file type
-                    file_type = self._get_file_type(temp_file_path)
-                    if file_type in self.supported_extensions:
-                        collected_files.append(temp_file_path)
-                    else:
-                        logger.warning(f"Unsupported file type: {file_type} for {uploaded_file.name}")
-                
-            except Exception as e:
-                errors.append({
-                    'file_name': uploaded_file.name,
-                    'error_message': str(e),
-                    'encodings_tried': []
-                })
+        # Uploads are independent and the work is I/O-bound, so fan out over threads;
+        # map() keeps results in upload order. Each upload gets its own numbered
+        # subdirectory so uploads or zip members sharing a name never collide.
+        if uploaded_files:
+            max_workers = min(self.max_workers, len(uploaded_files))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = executor.map(
+                    lambda index, uploaded_file: self._process_single_upload(
+                        uploaded_file,
+                        os.path.join(temp_dir, str(index)),
+                        os.path.join(extract_dir, str(index))
+                    ),
+                    range(len(uploaded_files)),
+                    uploaded_files
+                )
+                for file_paths, file_errors, file_size in results:
+                    collected_files.extend(file_paths)
+                    errors.extend(file_errors)
+                    total_size += file_size
         
         # Check total size
         if total_size > self.max_total_size:
@@ -89,6 +96,45 @@ class FileCollector:
         
         return collected_files, errors
     
+    def _process_single_upload(self, uploaded_file, upload_dir: str, extract_dir: str) -> Tuple[List[Tuple[str, str]], List[Dict[str, Any]], int]:
+        """
+        Save, validate and (if needed) extract one uploaded file.
+        upload_dir and extract_dir must be private to this upload.
+        Returns ([(file_path, file_type), ...], errors, counted_size)
+        """
+        try:
+            # Check single file size
+            if uploaded_file.size > self.max_single_file_size:
+                return [], [{
+                    'file_name': uploaded_file.name,
+                    'error_message': f'File size {uploaded_file.size / (1024*1024):.1f}MB exceeds limit of 100MB',
+                    'encodings_tried': []
+                }], 0
+            
+            # Save uploaded file to its own directory
+            os.makedirs(upload_dir, exist_ok=True)
+            temp_file_path = os.path.join(upload_dir, uploaded_file.name)
+            save_upload(uploaded_file, temp_file_path)
+            
+            # Check if it's a zip file
+            if self._is_zip_file(temp_file_path):
+                return self._extract_zip(temp_file_path, extract_dir), [], uploaded_file.size
+            
+            # Check file type
+            file_type = self._get_file_type(temp_file_path)
+            if file_type in self.supported_extensions:
+                return [(temp_file_path, file_type)], [], uploaded_file.size
+            
+            logger.warning(f"Unsupported file type: {file_type} for {uploaded_file.name}")
+            return [], [], uploaded_file.size
+            
+        except Exception as e:
+            return [], [{
+                'file_name': uploaded_file.name,
+                'error_message': str(e),
+                'encodings_tried': []
+            }], uploaded_file.size
+    
     def _is_zip_file(self, file_path: str) -> bool:
         """Check if file is a zip file"""
         try:
@@ -96,36 +142,50 @@ class FileCollector:
         except:
             return False
     
-    def _extract_zip(self, zip_path: str, extract_dir: str) -> List[str]:
-        """Recursively extract zip files"""
+    def _extract_zip(self, zip_path: str, extract_dir: str) -> List[Tuple[str, str]]:
+        """
+        Recursively extract zip files, returning (file_path, file_type) pairs.
+        Each member's first bytes are read from the archive to decide its type,
+        so unsupported members are never written to disk.
+        """
         extracted_files = []
+        root = os.path.realpath(extract_dir)
         
         try:
             with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                for member in zip_ref.namelist():
+                for member in zip_ref.infolist():
                     # Skip directories and hidden files
-                    if member.endswith('/') or member.startswith('.'):
+                    if member.is_dir() or member.filename.startswith('.'):
                         continue
                     
-                    # Extract file
-                    zip_ref.extract(member, extract_dir)
-                    extracted_path = os.path.join(extract_dir, member)
+                    # Same containment rule as ZipFile.extract: no escaping extract_dir
+                    extracted_path = os.path.realpath(os.path.join(root, member.filename))
+                    if os.path.commonpath([root, extracted_path]) != root:
+                        logger.warning(f"Skipping zip member outside extract dir: {member.filename}")
+                        continue
+                    
+                    with zip_ref.open(member) as src:
+                        head = src.read(512)
+                        is_zip = head.startswith(ZIP_SIGNATURES)
+                        if not is_zip:
+                            # Check if it's a supported file type before writing anything
+                            file_type = self._file_type_from_head(extracted_path, head)
+                            if file_type not in self.supported_extensions:
+                                continue
+                        
+                        os.makedirs(os.path.dirname(extracted_path), exist_ok=True)
+                        with open(extracted_path, 'wb') as dst:
+                            dst.write(head)
+                            shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
                     
-                    # Check if extracted file is another zip
-                    if self._is_zip_file(extracted_path):
+                    if is_zip:
                         # Recursively extract nested zip
                         nested_files = self._extract_zip(extracted_path, extract_dir)
                         extracted_files.extend(nested_files)
                         # Remove the zip file after extraction
                         os.remove(extracted_path)
                     else:
-                        # Check if it's a supported file type
-                        file_type = self._get_file_type(extracted_path)
-                        if file_type in self.supported_extensions:
-                            extracted_files.append(extracted_path)
-                        else:
-                            # Remove unsupported files
-                            os.remove(extracted_path)
+                        extracted_files.append((extracted_path, file_type))
         
         except Exception as e:
             logger.error(f"Error extracting zip file {zip_path}: {e}")
@@ -134,44 +194,154 @@ class FileCollector:
     
     def _get_file_type(self, file_path: str) -> str:
         """Get file type based on extension and content"""
-        try:
-            # First try to get MIME type
-            mime_type = magic.from_file(file_path, mime=True)
-            
-            if mime_type == 'text/html':
-                return '.html'
-            elif mime_type == 'text/plain':
-                return '.txt'
-            elif mime_type == 'application/pdf':
-                return '.pdf'
-            
-            # Fallback to extension
-            ext = Path(file_path).suffix.lower()
-            if ext in self.supported_extensions:
-                return ext
-            
+        # Trust a supported extension; content is only sniffed for unknown suffixes
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext in self.supported_extensions:
             return ext
-            
-        except Exception as e:
+        
+        try:
+            with open(file_path, 'rb') as f:
+                head = f.read(512)
+        except OSError as e:
             logger.warning(f"Could not determine file type for {file_path}: {e}")
             # Fallback to extension
-            return Path(file_path).suffix.lower()
+            return ext
+        return self._sniff_file_type(head) or ext
     
-    def deduplicate_drives(self, drives: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _file_type_from_head(self, file_path: str, head: bytes) -> str:
+        """Like _get_file_type, but for a header that has already been read"""
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext in self.supported_extensions:
+            return ext
+        
+        return self._sniff_file_type(head) or ext
+    
+    def _sniff_file_type(self, head: bytes) -> str:
+        """Classify a file from its first bytes; returns '' when undecided"""
+        if not head:
+            return ''
+        if head.startswith(_UTF16_BOMS):
+            # NUL-heavy but still text; try_encodings picks the codec up via chardet
+            return '.txt'
+        if head.startswith(codecs.BOM_UTF8):
+            head = head[len(codecs.BOM_UTF8):]
+        
+        match = _HEADER_SIGNATURES.search(head)
+        if match:
+            return _SIGNATURE_TYPES[match.lastgroup]
+        if b'\x00' not in head:
+            # No NUL bytes: treat as plain text, like libmagic's text/plain
+            return '.txt'
+        return ''
+    
+    def deduplicate_drives(self, drives: Union[List[Dict[str, Any]], pd.DataFrame]) -> Union[List[Dict[str, Any]], pd.DataFrame]:
         """
         Deduplicate drives by VPD Serial, keeping the first occurrence.
+        Accepts either a list of drive dicts or a drives DataFrame and
+        returns the same type.
         """
-        seen_serials = set()
+        if isinstance(drives, pd.DataFrame):
+            return self._deduplicate_frame(drives)
+        
+        first_seen = {}
         unique_drives = []
         
         for drive in drives:
-            vpd_serial = drive.get('VPD Serial', '').strip()
+            vpd_serial = (drive.get('VPD Serial') or '').strip()
             
-            if vpd_serial and vpd_serial not in seen_serials:
-                seen_serials.add(vpd_serial)
-                unique_drives.append(drive)
-            elif not vpd_serial:
+            if not vpd_serial:
                 # Keep drives without serial numbers (parsing errors, etc.)
                 unique_drives.append(drive)
+            elif first_seen.setdefault(vpd_serial, drive) is drive:
+                unique_drives.append(drive)
         
         return unique_drives
+    
+    def _deduplicate_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Vectorized deduplication using pandas' hash-based duplicated()"""
+        vpd_serials = df['VPD Serial'].fillna('').astype(str).str.strip()
+        # Drives without serial numbers are always kept
+        mask = vpd_serials.eq('') | ~vpd_serials.duplicated(keep='first')
+        return df[mask]
+
+
+def save_upload(uploaded_file, dest_path: str) -> str:
+    """
+    Write an uploaded file to dest_path and return it.
+    Uploads Django already spooled to disk are moved into place (a rename on the
+    same filesystem); in-memory ones are copied in COPY_BUFFER_SIZE blocks.
+    """
+    if isinstance(uploaded_file, TemporaryUploadedFile):
+        file_move_safe(uploaded_file.temporary_file_path(), dest_path, allow_overwrite=True)
+        # The spooled file is created 0600; match what FileSystemStorage would leave
+        if settings.FILE_UPLOAD_PERMISSIONS is not None:
+            os.chmod(dest_path, settings.FILE_UPLOAD_PERMISSIONS)
+        return dest_path
+    
+    uploaded_file.seek(0)
+    with open(dest_path, 'wb') as destination:
+        shutil.copyfileobj(uploaded_file, destination, COPY_BUFFER_SIZE)
+    return dest_path
+
+
+def bulk_save_errors(job, errors: List[Dict[str, Any]], batch=None) -> int:
+    """
+    Persist collected error dicts as ParseError rows for a job (or a legacy UploadBatch).
+    Streams rows through COPY on PostgreSQL, otherwise uses a single
+    batched INSERT. Returns the number of rows written.
+    """
+    if not errors:
+        return 0
+    
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            _copy_errors(job, errors, batch)
+        else:
+            ParseError.objects.bulk_create([
+                ParseError(
+                    batch=batch,
+                    job=job,
+                    file_name=error['file_name'],
+                    error_message=error['error_message'],
+                    encodings_tried=error.get('encodings_tried', [])
+                )
+                for error in errors
+            ], batch_size=1000, ignore_conflicts=False)
+    
+    return len(errors)
+
+
+def _copy_errors(job, errors: List[Dict[str, Any]], batch=None):
+    """Write ParseError rows with COPY FROM STDIN (PostgreSQL only)"""
+    meta = ParseError._meta
+    columns = [meta.get_field(name).column for name in
+               ('batch', 'job', 'file_name', 'error_message', 'encodings_tried', 'created_at')]
+    created_at = timezone.now().isoformat()
+    
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+    for error in errors:
+        writer.writerow([
+            batch.pk if batch is not None else '',
+            job.pk if job is not None else '',
+            error['file_name'],
+            error['error_message'],
+            json.dumps(error.get('encodings_tried', [])),
+            created_at,
+        ])
+    buffer.seek(0)
+    
+    # Every field is quoted so empty strings survive; only the FKs may be NULL
+    sql = (
+        f"COPY {meta.db_table} ({', '.join(columns)}) "
+        f"FROM STDIN WITH (FORMAT csv, FORCE_NULL ({columns[0]}, {columns[1]}))"
+    )
+    with connection.cursor() as cursor:
+        raw_cursor = cursor.cursor
+        if hasattr(raw_cursor, 'copy_expert'):
+            # psycopg2
+            raw_cursor.copy_expert(sql, buffer)
+        else:
+            # psycopg3
+            with raw_cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
@@ -1,35 +1,73 @@
+import codecs
 import logging
+import mmap
+import os
 from typing import Tuple, List
 
+import chardet
+
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_ENCODINGS = ['utf-8', 'iso-8859-1', 'cp1252']
+
+# Bytes handed to chardet; enough to classify a report without scanning all of it
+DETECTION_SAMPLE_SIZE = 64 * 1024
+
+
+def universal_newlines(text: str) -> str:
+    """Translate \r\n and \r to \n, as text-mode open() did"""
+    if "\r" not in text:
+        return text
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
 
-def try_encodings(file_path: str) -> Tuple[str, str, List[str]]:
+def try_encodings(file_path: str, encodings_to_try: List[str] = None) -> Tuple[str, str, List[str]]:
     """
     Try different encodings to read a file.
+    The file is memory-mapped once and each candidate decodes straight from
+    the mapping; after the first failure chardet's guess is tried ahead of the rest.
     Returns (content, successful_encoding, attempted_encodings)
     """
-    encodings_to_try = ['utf-8', 'iso-8859-1', 'cp1252']
+    try:
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # mmap cannot map an empty file
+                return _decode_candidates(file_path, b'', encodings_to_try)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return _decode_candidates(file_path, data, encodings_to_try)
+    except Exception as e:
+        logger.error(f"Failed to read {file_path} with any encoding: {e}")
+        raise
+
+
+def _decode_candidates(file_path: str, data, encodings_to_try: List[str] = None) -> Tuple[str, str, List[str]]:
+    """
+    Decode a bytes-like buffer (bytes or mmap) with each candidate encoding.
+    codecs decoders read the buffer directly, so an mmap is never copied into bytes.
+    """
+    candidates = list(encodings_to_try or DEFAULT_ENCODINGS)
     attempted = []
+    detected = False
     
-    for encoding in encodings_to_try:
+    while len(attempted) < len(candidates):
+        encoding = candidates[len(attempted)]
         attempted.append(encoding)
         try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                content = f.read()
+            content = codecs.getdecoder(encoding)(data)[0]
             logger.info(f"Successfully read {file_path} with encoding: {encoding}")
             return content, encoding, attempted
-        except UnicodeDecodeError:
+        except (UnicodeDecodeError, LookupError):
             logger.warning(f"Failed to read {file_path} with encoding: {encoding}")
-            continue
+        
+        # After the first miss, try chardet's guess before the remaining candidates
+        if not detected:
+            detected = True
+            guess = chardet.detect(data[:DETECTION_SAMPLE_SIZE]).get('encoding')
+            if guess and guess.lower() not in candidates:
+                candidates.insert(len(attempted), guess.lower())
     
-    # If all encodings fail, try with errors='replace'
-    try:
-        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-            content = f.read()
-        logger.warning(f"Read {file_path} with UTF-8 and error replacement")
-        return content, 'utf-8-with-replacement', attempted
-    except Exception as e:
-        logger.error(f"Failed to read {file_path} with any encoding: {e}")
-        raise
+    # If all encodings fail, decode with errors='replace'
+    content = codecs.getdecoder('utf-8')(data, 'replace')[0]
+    logger.warning(f"Read {file_path} with UTF-8 and error replacement")
+    return content, 'utf-8-with-replacement', attempted
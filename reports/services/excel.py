@@ -1,13 +1,16 @@
+import csv
 import pandas as pd
 import logging
 from pathlib import Path
-from typing import List, Dict, Any
-from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Font
-from openpyxl.utils.dataframe import dataframe_to_rows
+from typing import List, Dict, Any, Union
+import xlsxwriter
+from xlsxwriter.utility import xl_rowcol_to_cell
 
 logger = logging.getLogger(__name__)
 
+# Drives may be passed as parsed dicts or as a DataFrame from create_dataframe()
+Drives = Union[List[Dict[str, Any]], pd.DataFrame]
+
 
 class ExcelWriter:
     """Handles Excel and CSV file generation with formatting"""
@@ -25,34 +28,45 @@ class ExcelWriter:
             "Allocated Sections",
             "Grown Defects"
         ]
+        
+        # Health Score colors
+        self.green_color = "#90EE90"  # Light Green
+        self.yellow_color = "#FFFF99"  # Light Yellow
+        self.red_color = "#FFB6C1"  # Light Red
     
-    def write_excel(self, drives: List[Dict[str, Any]], output_path: str, errors: List[Dict[str, Any]] = None) -> str:
+    def write_excel(self, drives: Drives, output_path: str, errors: List[Dict[str, Any]] = None) -> str:
         """
         Write drives data to Excel file with formatting.
         Returns the path to the created file.
         """
         try:
             # Create DataFrame
-            df = self._create_dataframe(drives)
+            df = self.create_dataframe(drives)
+            rows = df.values.tolist()
+            
+            # constant_memory flushes each row to disk once the next row starts,
+            # so column widths and panes must be set before writing rows.
+            # Report text is data: never turn a URL-like string into a hyperlink
+            wb = xlsxwriter.Workbook(output_path, {'constant_memory': True, 'strings_to_urls': False})
+            ws = wb.add_worksheet("Drive Summary")
+            header_format = wb.add_format({'bold': True})
             
-            # Create Excel file with formatting
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Drive Summary"
+            ws.freeze_panes(1, 0)
+            self._set_column_widths(ws, df)
             
-            # Write data to worksheet
-            for r in dataframe_to_rows(df, index=False, header=True):
-                ws.append(r)
+            ws.write_row(0, 0, self.required_columns, header_format)
+            for row_idx, row in enumerate(rows, start=1):
+                ws.write_row(row_idx, 0, row)
             
-            # Apply formatting
-            self._apply_formatting(ws, df)
+            # Apply conditional formatting for Health Score
+            self._apply_health_formatting(wb, ws, len(rows))
             
             # Add errors sheet if there are errors
             if errors:
                 self._add_errors_sheet(wb, errors)
             
             # Save file
-            wb.save(output_path)
+            wb.close()
             logger.info(f"Excel file saved to {output_path}")
             return output_path
             
@@ -60,14 +74,22 @@ class ExcelWriter:
             logger.error(f"Error writing Excel file: {e}")
             raise
     
-    def write_csv(self, drives: List[Dict[str, Any]], output_path: str) -> str:
+    def write_csv(self, drives: Drives, output_path: str) -> str:
         """
         Write drives data to CSV file.
         Returns the path to the created file.
         """
         try:
-            df = self._create_dataframe(drives)
-            df.to_csv(output_path, index=False)
+            with open(output_path, 'w', newline='', encoding='utf-8') as f:
+                if isinstance(drives, pd.DataFrame):
+                    writer = csv.writer(f)
+                    writer.writerow(self.required_columns)
+                    writer.writerows(drives[self.required_columns].itertuples(index=False, name=None))
+                else:
+                    # Stream rows straight from the drive dicts; no DataFrame needed for CSV
+                    writer = csv.DictWriter(f, fieldnames=self.required_columns, restval='', extrasaction='ignore')
+                    writer.writeheader()
+                    writer.writerows(drives)
             logger.info(f"CSV file saved to {output_path}")
             return output_path
             
@@ -75,111 +97,105 @@ class ExcelWriter:
             logger.error(f"Error writing CSV file: {e}")
             raise
     
-    def _create_dataframe(self, drives: List[Dict[str, Any]]) -> pd.DataFrame:
+    def write_parquet(self, drives: Drives, output_path: str) -> str:
+        """
+        Write drives data to a zstd-compressed Parquet file.
+        Returns the path to the created file.
+        """
+        try:
+            df = self.create_dataframe(drives)[self.required_columns]
+            # Parquet columns need one type: blanks become nulls, integer-only
+            # columns become Int64 and anything still mixed is stored as text
+            df = df.mask(df.eq('')).convert_dtypes()
+            for col in df.columns:
+                if df[col].dtype == object:
+                    df[col] = df[col].astype('string')
+            
+            df.to_parquet(output_path, engine='pyarrow', compression='zstd', index=False)
+            logger.info(f"Parquet file saved to {output_path}")
+            return output_path
+            
+        except Exception as e:
+            logger.error(f"Error writing Parquet file: {e}")
+            raise
+    
+    def read_parquet(self, parquet_path: str) -> pd.DataFrame:
+        """Load a file written by write_parquet back into create_dataframe's shape"""
+        df = pd.read_parquet(parquet_path, engine='pyarrow').astype(object)
+        df = df.reindex(columns=self.required_columns)
+        return df.where(df.notna(), '')
+    
+    def excel_to_csv(self, excel_path: str, output_path: str) -> str:
+        """
+        Write the Drive Summary sheet of an existing workbook out as CSV.
+        Returns the path to the created file.
+        """
+        df = pd.read_excel(excel_path, sheet_name="Drive Summary", dtype=object, keep_default_na=False)
+        return self.write_csv(df.reindex(columns=self.required_columns, fill_value=''), output_path)
+    
+    def create_dataframe(self, drives: Drives) -> pd.DataFrame:
         """Create pandas DataFrame from drives data"""
-        if not drives:
-            # Create empty DataFrame with required columns
-            return pd.DataFrame(columns=self.required_columns)
-        
-        # Ensure all drives have all required columns
-        normalized_drives = []
-        for drive in drives:
-            normalized_drive = {}
-            for col in self.required_columns:
-                normalized_drive[col] = drive.get(col, '')
-            normalized_drives.append(normalized_drive)
+        if isinstance(drives, pd.DataFrame):
+            # Same column contract as the list path: required columns, in order
+            return drives.reindex(columns=self.required_columns, fill_value='')
         
-        df = pd.DataFrame(normalized_drives)
+        # Selects and orders the required columns; missing keys become NaN.
+        # object dtype keeps integer scores from turning into floats when some are None
+        df = pd.DataFrame(drives, columns=self.required_columns, dtype=object)
+        return df.where(df.notna(), '')
+    
+    def _apply_health_formatting(self, wb: xlsxwriter.Workbook, ws, row_count: int):
+        """Color Health Score cells: green >95%, yellow 90–95%, red <90%"""
+        if not row_count:
+            return
         
-        # Ensure columns are in the correct order
-        df = df[self.required_columns]
+        health_col_idx = self.required_columns.index("Health Score")
+        cell_range = (1, health_col_idx, row_count, health_col_idx)
         
-        return df
+        # 'cell' rules treat blanks as 0 and text as above any number, so
+        # guard with ISNUMBER to leave missing scores and error rows unfilled.
+        # Formulas are relative to the first cell of the range.
+        cell = xl_rowcol_to_cell(1, health_col_idx)
+        rules = [
+            (f'=AND(ISNUMBER({cell}),{cell}>95)', self.green_color),
+            (f'=AND(ISNUMBER({cell}),{cell}>=90,{cell}<=95)', self.yellow_color),
+            (f'=AND(ISNUMBER({cell}),{cell}<90)', self.red_color),
+        ]
+        for criteria, color in rules:
+            ws.conditional_format(*cell_range, {
+                'type': 'formula',
+                'criteria': criteria,
+                'format': wb.add_format({'bg_color': color}),
+            })
     
-    def _apply_formatting(self, ws, df: pd.DataFrame):
-        """Apply Excel formatting to the worksheet"""
-        # Freeze header row
-        ws.freeze_panes = "A2"
-        
-        # Auto-size columns
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            
+    def _set_column_widths(self, ws, df: pd.DataFrame):
+        """Auto-size columns from headers and values, measuring each column with pandas string ops"""
+        for idx, col in enumerate(df.columns):
+            # str.len().max() is NaN for an empty sheet; fall back to the header
+            value_width = df[col].astype(str).str.len().max()
+            max_length = max(len(str(col)), 0 if pd.isna(value_width) else int(value_width))
             adjusted_width = min(max_length + 2, 50)  # Cap at 50 characters
-            ws.column_dimensions[column_letter].width = adjusted_width
-        
-        # Apply conditional formatting for Health Score
-        health_col_idx = self.required_columns.index("Health Score") + 1  # +1 for 1-based indexing
-        health_col_letter = ws.cell(row=1, column=health_col_idx).column_letter
-        
-        # Define colors for conditional formatting
-        green_fill = PatternFill(start_color="90EE90", end_color="90EE90", fill_type="solid")  # Light Green
-        yellow_fill = PatternFill(start_color="FFFF99", end_color="FFFF99", fill_type="solid")  # Light Yellow  
-        red_fill = PatternFill(start_color="FFB6C1", end_color="FFB6C1", fill_type="solid")  # Light Red
-        
-        # Apply conditional formatting to Health Score column
-        for row in range(2, len(df) + 2):  # Start from row 2 (skip header)
-            cell = ws.cell(row=row, column=health_col_idx)
-            try:
-                health_score = int(cell.value) if cell.value else 0
-                
-                if health_score > 95:
-                    cell.fill = green_fill  # Green: >95%
-                elif health_score >= 90:
-                    cell.fill = yellow_fill  # Yellow: 90–95%
-                elif health_score < 90:
-                    cell.fill = red_fill  # Red: <90%
-            except (ValueError, TypeError):
-                # Skip cells that can't be converted to int
-                pass
-        
-        # Bold header row
-        header_font = Font(bold=True)
-        for cell in ws[1]:
-            cell.font = header_font
+            ws.set_column(idx, idx, adjusted_width)
     
-    def _add_errors_sheet(self, wb: Workbook, errors: List[Dict[str, Any]]):
+    def _add_errors_sheet(self, wb: xlsxwriter.Workbook, errors: List[Dict[str, Any]]):
         """Add errors sheet to workbook"""
-        ws_errors = wb.create_sheet("Errors")
-        
-        # Headers
-        ws_errors.append(["File Name", "Error Details", "Encodings Attempted"])
+        ws_errors = wb.add_worksheet("Errors")
+        header_format = wb.add_format({'bold': True})
         
-        # Data
-        for error in errors:
-            ws_errors.append([
+        headers = ["File Name", "Error Details", "Encodings Attempted"]
+        rows = [
+            [
                 error.get("file_name", ""),
                 error.get("error_message", ""),
                 ", ".join(error.get("encodings_tried", []))
-            ])
+            ]
+            for error in errors
+        ]
         
         # Format errors sheet
-        ws_errors.freeze_panes = "A2"
-        
-        # Auto-size columns
-        for column in ws_errors.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            
-            adjusted_width = min(max_length + 2, 50)
-            ws_errors.column_dimensions[column_letter].width = adjusted_width
+        ws_errors.freeze_panes(1, 0)
+        self._set_column_widths(ws_errors, pd.DataFrame(rows, columns=headers))
         
-        # Bold header row
-        header_font = Font(bold=True)
-        for cell in ws_errors[1]:
-            cell.font = header_font
+        ws_errors.write_row(0, 0, headers, header_format)
+        for row_idx, row in enumerate(rows, start=1):
+            ws_errors.write_row(row_idx, 0, row)
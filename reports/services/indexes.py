@@ -0,0 +1,75 @@
+import logging
+from contextlib import contextmanager
+
+from django.db import connection
+
+from ..models import ParsingJob
+
+logger = logging.getLogger(__name__)
+
+# Indexes that can be dropped while ParsingJob rows are bulk loaded.
+# The (status, -created_at) index stays: lookups by status are needed while jobs run.
+DEFERRABLE_INDEXES = ['reports_par_created_e20561_idx']
+
+
+def _deferrable_indexes():
+    return [index for index in ParsingJob._meta.indexes if index.name in DEFERRABLE_INDEXES]
+
+
+def _existing_index_names():
+    with connection.cursor() as cursor:
+        return set(connection.introspection.get_constraints(cursor, ParsingJob._meta.db_table))
+
+
+def drop_deferrable_indexes():
+    """
+    Drop non-critical ParsingJob indexes with DROP INDEX CONCURRENTLY.
+    Returns the names dropped; a no-op outside PostgreSQL.
+    """
+    if connection.vendor != 'postgresql':
+        logger.info("Skipping index drop: not running on PostgreSQL")
+        return []
+    
+    existing = _existing_index_names()
+    dropped = []
+    with connection.schema_editor(atomic=False) as schema_editor:
+        for index in _deferrable_indexes():
+            if index.name in existing:
+                logger.info(f"Dropping index {index.name}")
+                schema_editor.remove_index(ParsingJob, index, concurrently=True)
+                dropped.append(index.name)
+    return dropped
+
+
+def create_deferrable_indexes():
+    """
+    Rebuild indexes removed by drop_deferrable_indexes with CREATE INDEX CONCURRENTLY.
+    Returns the names created; a no-op outside PostgreSQL.
+    """
+    if connection.vendor != 'postgresql':
+        logger.info("Skipping index rebuild: not running on PostgreSQL")
+        return []
+    
+    existing = _existing_index_names()
+    created = []
+    with connection.schema_editor(atomic=False) as schema_editor:
+        for index in _deferrable_indexes():
+            if index.name not in existing:
+                logger.info(f"Creating index {index.name}")
+                schema_editor.add_index(ParsingJob, index, concurrently=True)
+                created.append(index.name)
+    return created
+
+
+@contextmanager
+def deferred_indexes():
+    """
+    Drop non-critical ParsingJob indexes for the duration of a bulk load and
+    rebuild them afterwards, so inserts do not pay for index maintenance.
+    Must not be used inside a transaction (CONCURRENTLY cannot run in one).
+    """
+    drop_deferrable_indexes()
+    try:
+        yield
+    finally:
+        create_deferrable_indexes()
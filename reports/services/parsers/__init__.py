@@ -2,5 +2,6 @@ from .base import ParserBase
 from .html_parser import HTMLParser
 from .txt_parser import TXTParser
 from .pdf_parser import PDFParser
+from .batch import parse_many
 
-__all__ = ['ParserBase', 'HTMLParser', 'TXTParser', 'PDFParser']
+__all__ = ['ParserBase', 'HTMLParser', 'TXTParser', 'PDFParser', 'parse_many']
@@ -3,7 +3,24 @@ from typing import List, Dict, Any
 
 
 class ParserBase(ABC):
-    """Base class for all file parsers"""
+    """
+    Base class for all file parsers.
+    Parsers keep no per-file state (compiled patterns live on the class or
+    module), so one instance may parse any number of files, from any thread.
+    """
+    
+    # Copied for every row; 'File Name' is filled in per file
+    _DEFAULT_DRIVE_DATA = {
+        'Label Serial': '',
+        'VPD Serial': '',
+        'Model Number': '',
+        'Vendor Information': '',
+        'Vendor': 'Unknown',
+        'File Name': '',
+        'Health Score': 0,
+        'Allocated Sections': 0,
+        'Grown Defects': 0,
+    }
     
     @abstractmethod
     def parse(self, file_path: str, file_name: str) -> List[Dict[str, Any]]:
@@ -15,14 +32,6 @@ class ParserBase(ABC):
     
     def get_default_drive_data(self, file_name: str) -> Dict[str, Any]:
         """Return default drive data structure"""
-        return {
-            'Label Serial': '',
-            'VPD Serial': '',
-            'Model Number': '',
-            'Vendor Information': '',
-            'Vendor': 'Unknown',
-            'File Name': file_name,
-            'Health Score': 0,
-            'Allocated Sections': 0,
-            'Grown Defects': 0,
-        }
+        drive = self._DEFAULT_DRIVE_DATA.copy()
+        drive['File Name'] = file_name
+        return drive
@@ -0,0 +1,68 @@
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from .html_parser import HTMLParser
+from .txt_parser import TXTParser
+from .pdf_parser import PDFParser
+
+logger = logging.getLogger(__name__)
+
+# Parsers keep no per-file state, so one instance per extension (per worker) serves every file
+PARSERS = {
+    '.html': HTMLParser(),
+    '.txt': TXTParser(),
+    '.pdf': PDFParser(),
+}
+
+# Files handed to a worker per round trip; uploads are capped at 50 files
+MAX_CHUNKSIZE = 8
+
+# (drives, error_message) for one file; error_message is None on success
+ParseResult = Tuple[List[Dict[str, Any]], Optional[str]]
+
+
+def parse_one(item: Tuple[str, ...]) -> ParseResult:
+    """
+    Parse a single (file_path, file_name[, file_type]) item with the parser for its type.
+    file_type defaults to the path's extension; FileCollector passes the sniffed
+    type so files whose content does not match their name still dispatch.
+    """
+    file_path, file_name, *file_type = item
+    file_ext = file_type[0] if file_type else os.path.splitext(file_path)[1].lower()
+    
+    parser = PARSERS.get(file_ext)
+    if parser is None:
+        logger.warning(f"Unknown file extension: {file_ext}")
+        return [], None
+    
+    try:
+        return parser.parse(file_path, file_name), None
+    except Exception as e:
+        logger.error(f"Error parsing file {file_path}: {e}")
+        return [], str(e)
+
+
+def parse_many(pairs: Iterable[Tuple[str, ...]], max_workers: int = None) -> List[ParseResult]:
+    """
+    Parse (file_path, file_name[, file_type]) items across a process pool.
+    Only paths cross the process boundary; results come back in input order.
+    Parses in-process for a single file, for max_workers=1, inside a daemonic
+    process such as a Celery prefork child (which may not have children) or
+    when no pool can be started. In practice only the legacy parse_files view
+    gets a pool; process_files_task always parses serially.
+    """
+    pairs = list(pairs)
+    workers = min(max_workers or os.cpu_count() or 1, len(pairs))
+    if workers <= 1 or multiprocessing.current_process().daemon:
+        return [parse_one(pair) for pair in pairs]
+    
+    chunksize = max(1, min(MAX_CHUNKSIZE, len(pairs) // (workers * 2)))
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(parse_one, pairs, chunksize=chunksize))
+    except (BrokenProcessPool, OSError) as e:
+        logger.warning(f"Process pool unavailable, parsing serially: {e}")
+        return [parse_one(pair) for pair in pairs]
@@ -0,0 +1,119 @@
+import re
+from functools import lru_cache
+from typing import List, Dict, Tuple, Optional, FrozenSet, Pattern, Iterable
+
+
+class FieldScanner:
+    """
+    Extract several fields from text in one regex pass.
+    
+    Each field has fallback patterns in priority order, each with one capture
+    group for the value. All of them are fused into a single alternation;
+    per field, the highest-priority pattern wins and, among its matches, the
+    earliest one -- the same result as searching each pattern in turn.
+    """
+    
+    def __init__(self, field_patterns: Dict[str, List[str]], flags: int = re.IGNORECASE):
+        self.fields = list(field_patterns)
+        self.flags = flags
+        
+        # (field, rank, body, lowercase leading keyword or None) per pattern
+        self._patterns: List[Tuple[str, int, str, Optional[str]]] = []
+        for field, bodies in field_patterns.items():
+            for rank, body in enumerate(bodies):
+                m = re.match(r'(?:\\b)?([A-Za-z]+)', body)
+                self._patterns.append((field, rank, body, m.group(1).lower() if m else None))
+        
+        # Without a keyword for every pattern the text cannot be prefiltered
+        self._keywords = None
+        if all(keyword for _, _, _, keyword in self._patterns):
+            self._keywords = sorted({keyword for _, _, _, keyword in self._patterns})
+        
+        self._compile = lru_cache(maxsize=64)(self._build)
+        self.regex, self._groups = self._compile(None)
+    
+    def _build(self, keywords: Optional[FrozenSet[str]]) -> Tuple[Pattern, Dict[str, Tuple[str, int, int]]]:
+        """
+        Fuse the patterns whose keyword is in keywords (all when None) into one regex.
+        Returns the regex and {group name: (field, rank, value group index)}.
+        """
+        # Each alternative sits in a lookahead, so matches never consume text
+        # another field could start in; its own capture group holds the value
+        alternatives = []
+        names = {}
+        for field, rank, body, keyword in self._patterns:
+            if keywords is None or keyword in keywords:
+                name = f'f{len(alternatives)}'
+                names[name] = (field, rank)
+                alternatives.append(f'(?=(?P<{name}>{body}))')
+        
+        gate_keywords = self._keywords if keywords is None else sorted(keywords)
+        regex = re.compile(self._keyword_gate(gate_keywords) + '(?:' + '|'.join(alternatives) + ')', self.flags)
+        groups = {name: (field, rank, regex.groupindex[name] + 1) for name, (field, rank) in names.items()}
+        return regex, groups
+    
+    @staticmethod
+    def _keyword_gate(keywords: Optional[List[str]]) -> str:
+        """
+        Cheap lookahead on the patterns' leading keywords ("hard", "serial", ...)
+        so the scan skips most positions without trying every alternative.
+        """
+        if not keywords:
+            return ''
+        initials = ''.join(sorted({kw[0] for kw in keywords}))
+        return f"(?=[{initials}](?:{'|'.join(kw[1:] for kw in keywords)}))"
+    
+    def extract(self, text: str) -> Dict[str, str]:
+        """Return every field's stripped value, or "" when no pattern matched"""
+        return self._values(self.scan(text))
+    
+    def scan(self, text: str) -> Dict[str, Tuple[int, int, str]]:
+        """Return {field: (rank, start, raw value)} for every field that matched"""
+        regex, groups = self.regex, self._groups
+        if self._keywords is not None:
+            # str.find-style prefilter: only patterns whose keyword occurs can match
+            text_lower = text.lower()
+            present = frozenset(kw for kw in self._keywords if kw in text_lower)
+            if not present:
+                return {}
+            if len(present) < len(self._keywords):
+                regex, groups = self._compile(present)
+        
+        best: Dict[str, Tuple[int, int, str]] = {}
+        # Fields holding a first-choice match; no later match can replace those
+        settled = 0
+        for m in regex.finditer(text):
+            field, rank, group = groups[m.lastgroup]
+            if field not in best or rank < best[field][0]:
+                best[field] = (rank, m.start(), m.group(group) or "")
+                if rank == 0:
+                    settled += 1
+                    if settled == len(self.fields):
+                        break
+        return best
+    
+    def extract_chunks(self, chunks: Iterable[str], stop_fields: Iterable[str] = ()) -> Dict[str, str]:
+        """
+        extract("".join(chunks)), pulling chunks lazily (e.g., PDF pages).
+        Stops reading once every field in stop_fields has matched its first-choice
+        pattern; later chunks could then only fill in the remaining fields.
+        Each chunk is scanned together with the one before it, so a match may
+        span one chunk boundary.
+        """
+        stop_fields = list(stop_fields)
+        best: Dict[str, Tuple[int, int, str]] = {}
+        previous, offset = "", 0
+        for chunk in chunks:
+            for field, (rank, start, value) in self.scan(previous + chunk).items():
+                start += offset
+                # Same rank and position: the match seen again with more text after it
+                if field not in best or (rank, start) <= best[field][:2]:
+                    best[field] = (rank, start, value)
+            if stop_fields and all(field in best and best[field][0] == 0 for field in stop_fields):
+                break
+            offset += len(previous)
+            previous = chunk
+        return self._values(best)
+    
+    def _values(self, best: Dict[str, Tuple[int, int, str]]) -> Dict[str, str]:
+        return {field: best[field][2].strip() if field in best else "" for field in self.fields}
@@ -1,91 +1,223 @@
+import os
 import re
+import codecs
 import logging
+import mmap
 from bs4 import BeautifulSoup
-from typing import List, Dict, Any, Tuple
+from lxml import etree
+from typing import List, Dict, Any, Tuple, Union
 from pathlib import Path
 from .base import ParserBase
+from .fields import FieldScanner
+from ..encoding import universal_newlines
 from ..vendor import derive_vendor
 
 logger = logging.getLogger(__name__)
 
-# Enhanced patterns with multiple fallbacks
+# Enhanced patterns with multiple fallbacks, listed per field in priority order.
 # Patterns handle both compact format (Model ID: value) and spaced format with dots (Model ID . . . : value)
-SERIAL_PATTERNS = [
-    re.compile(r'Hard\s*Disk\s*Serial\s*Number\s*[:\.\s\-]+:\s*([A-Z0-9\-]{8,20})', re.IGNORECASE),
-    re.compile(r'\bVPD\s*Serial\s*[:\.\s\-]+:\s*([A-Z0-9\-]{8,20})', re.IGNORECASE),
-    re.compile(r'\bSerial\s*Number\s*[:\.\s\-]+:\s*([A-Z0-9\-]{8,20})', re.IGNORECASE),
-    re.compile(r'\bSerial\s*[:\.\s\-]+:\s*([A-Z0-9\-]{8,20})', re.IGNORECASE),
-]
+FIELD_PATTERNS = {
+    'serial': [
+        r'Hard\s*Disk\s*Serial\s*Number\s*[:\.\s\-]+:\s*([A-Z0-9\-]{8,20})',
+        r'\bVPD\s*Serial\s*[:\.\s\-]+:\s*([A-Z0-9\-]{8,20})',
+        r'\bSerial\s*Number\s*[:\.\s\-]+:\s*([A-Z0-9\-]{8,20})',
+        r'\bSerial\s*[:\.\s\-]+:\s*([A-Z0-9\-]{8,20})',
+    ],
+    'model': [
+        r'Hard\s*Disk\s*Model\s*ID\s*[:\.\s\-]+:\s*(.+)',
+        r'\bModel\s*ID\s*[:\.\s\-]+:\s*(.+)',
+        r'\bModel\s*[:\.\s\-]+:\s*(.+)',
+        r'Hard\s*Disk\s*Model\s*[:\.\s\-]+:\s*(.+)',
+    ],
+    'vendor_info': [
+        r'Vendor\s*Information\s*[:\.\s\-]+:\s*(.+)',
+        r'\bVendor\s*[:\.\s\-]+:\s*(.+)',
+        r'\bManufacturer\s*[:\.\s\-]+:\s*(.+)',
+    ],
+    'health': [
+        # Matches: "Health : #################### 100 % (Excellent)" or "Health: 100%" or "Health : 100"
+        r'Health\s*[:\.\s\-]+[:\s]*[#\s]*(\d{1,3})\s*%',
+        r'Health\s*Score\s*[:\.\s\-]+:\s*(\d{1,3})\s*%?',
+        r'Overall\s*Health\s*[:\.\s\-]+:\s*(\d{1,3})\s*%?',
+    ],
+    'realloc': [
+        r'Reallocated\s*Sector\s*Count\s*[:\-]?\s*(\d+)',
+        r'Reallocated\s*Sectors?\s*[:\-]?\s*(\d+)',
+        r'Allocated\s*Sections\s*[:\-]?\s*(\d+)',
+        r'\bReallocated\s*[:\-]?\s*(\d+)',
+    ],
+    'grown': [
+        r'Grown\s*Defect(?:\s*Count)?\s*[:\-]?\s*(\d+)',
+        r'Grown\s*Defects\s*[:\-]?\s*(\d+)',
+        r'\bDefect\s*Count\s*[:\-]?\s*(\d+)',
+    ],
+}
 
-MODEL_PATTERNS = [
-    re.compile(r'Hard\s*Disk\s*Model\s*ID\s*[:\.\s\-]+:\s*(.+)', re.IGNORECASE),
-    re.compile(r'\bModel\s*ID\s*[:\.\s\-]+:\s*(.+)', re.IGNORECASE),
-    re.compile(r'\bModel\s*[:\.\s\-]+:\s*(.+)', re.IGNORECASE),
-    re.compile(r'Hard\s*Disk\s*Model\s*[:\.\s\-]+:\s*(.+)', re.IGNORECASE),
-]
+# All field patterns fused into one alternation so a section is scanned once
+FIELD_SCANNER = FieldScanner(FIELD_PATTERNS)
 
-VENDOR_INFO_PATTERNS = [
-    re.compile(r'Vendor\s*Information\s*[:\.\s\-]+:\s*(.+)', re.IGNORECASE),
-    re.compile(r'\bVendor\s*[:\.\s\-]+:\s*(.+)', re.IGNORECASE),
-    re.compile(r'\bManufacturer\s*[:\.\s\-]+:\s*(.+)', re.IGNORECASE),
-]
+# Drive section starts: "Hard Disk Serial Number", "Drive N", "Disk N", "Hard Disk N".
+# Zero-width, so finditer reports every start in order even where two boundaries
+# overlap ("Hard Disk 2" also starts "Disk 2"); the leading [hd] gate skips other positions
+SECTION_BOUNDARY_RE = re.compile(
+    r'(?=[hd](?:ard|rive|isk))'
+    r'(?=Hard\s*Disk\s*Serial\s*Number|\bDrive\s+\d|\bDisk\s+\d|Hard\s*Disk\s+\d)',
+    re.IGNORECASE,
+)
 
-HEALTH_PATTERNS = [
-    # Matches: "Health : #################### 100 % (Excellent)" or "Health: 100%" or "Health : 100"
-    re.compile(r'Health\s*[:\.\s\-]+[:\s]*[#\s]*(\d{1,3})\s*%', re.IGNORECASE),
-    re.compile(r'Health\s*Score\s*[:\.\s\-]+:\s*(\d{1,3})\s*%?', re.IGNORECASE),
-    re.compile(r'Overall\s*Health\s*[:\.\s\-]+:\s*(\d{1,3})\s*%?', re.IGNORECASE),
-]
+# Not replaceable by str.split('\n\n'): get_text() separates sibling tags with
+# whitespace-only lines such as '\n \n', which must still end a block
+BLANK_LINES_RE = re.compile(r'\n\s*\n+')
 
-REALLOC_PATTERNS = [
-    re.compile(r'Reallocated\s*Sector\s*Count\s*[:\-]?\s*(\d+)', re.IGNORECASE),
-    re.compile(r'Reallocated\s*Sectors?\s*[:\-]?\s*(\d+)', re.IGNORECASE),
-    re.compile(r'Allocated\s*Sections\s*[:\-]?\s*(\d+)', re.IGNORECASE),
-    re.compile(r'\bReallocated\s*[:\-]?\s*(\d+)', re.IGNORECASE),
+# Drive boundaries for _alternative_parse
+ALT_DRIVE_PATTERNS = [
+    re.compile(r'Hard Disk Serial Number\s*:?\s*[A-Z0-9\-]{8,20}.*?(?=Hard Disk Serial Number|$)', re.IGNORECASE | re.DOTALL),
+    re.compile(r'Model ID\s*:?\s*.+?(?=Model ID|$)', re.IGNORECASE | re.DOTALL),
 ]
 
-GROWN_DEFECT_PATTERNS = [
-    re.compile(r'Grown\s*Defect(?:\s*Count)?\s*[:\-]?\s*(\d+)', re.IGNORECASE),
-    re.compile(r'Grown\s*Defects\s*[:\-]?\s*(\d+)', re.IGNORECASE),
-    re.compile(r'\bDefect\s*Count\s*[:\-]?\s*(\d+)', re.IGNORECASE),
-]
+# Divs whose class mentions a drive keyword, case-insensitively; matched by soupsieve
+# instead of calling a Python filter for every div
+DRIVE_DIV_SELECTOR = ', '.join(
+    f'div[class*="{keyword}" i]' for keyword in ['drive', 'disk', 'hard', 'section', 'block']
+)
+
+
+def extract_fields(text: str) -> Dict[str, str]:
+    """
+    Extract every field from text in a single FIELD_SCANNER pass.
+    Results match searching each FIELD_PATTERNS list in order.
+    """
+    return FIELD_SCANNER.extract(text)
+
+
+# Elements whose text BeautifulSoup.get_text() leaves out, and those keeping whitespace as-is
+_SKIPPED_TEXT_TAGS = {'script', 'style', 'template'}
+_ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+_PRESERVE_WHITESPACE_TAGS = {'pre', 'textarea'}
+
+# Files above this size are mapped and fed to lxml in chunks instead of read into one str
+MMAP_THRESHOLD = 256 * 1024
+FEED_CHUNK_SIZE = 1 << 20
 
-SECTION_BOUNDARIES = [
-    re.compile(r'Hard\s*Disk\s*Serial\s*Number\s*[:\-]?', re.IGNORECASE),
-    re.compile(r'\bDrive\s+\d+', re.IGNORECASE),
-    re.compile(r'\bDisk\s+\d+', re.IGNORECASE),
-    re.compile(r'Hard\s*Disk\s+\d+', re.IGNORECASE),
-]
 
+def _collapse_whitespace(text: str, preserve: bool) -> str:
+    """BeautifulSoup reduces whitespace-only strings to ' ' or '\n' outside <pre>/<textarea>"""
+    if preserve or text.strip(_ASCII_SPACES):
+        return text
+    return "\n" if "\n" in text else " "
 
-def extract_first(patterns: List[re.Pattern], text: str) -> str:
-    """Extract first match from a list of patterns"""
-    for pat in patterns:
-        m = pat.search(text)
-        if m:
-            return m.group(1).strip()
-    return ""
+
+def _visible_text(root) -> List[str]:
+    """
+    Text and tail strings in document order, skipping script/style/template bodies.
+    One iterwalk over the tree; an XPath ancestor:: predicate re-walks the
+    ancestors of every text node and goes quadratic on deep tables.
+    """
+    texts = []
+    # libxml2 puts text after </html> in a second top-level <html> element
+    for top in (root, *root.itersiblings()):
+        if isinstance(top.tag, str) and top.tag not in _SKIPPED_TEXT_TAGS:
+            _walk_text(top, texts)
+    return texts
+
+
+def _walk_text(top, texts: List[str]):
+    """Append the strings inside top (but not its tail) to texts"""
+    depth = 0
+    walker = etree.iterwalk(top, events=('start', 'end', 'comment', 'pi'))
+    for event, el in walker:
+        if event == 'start':
+            if el.tag in _SKIPPED_TEXT_TAGS:
+                walker.skip_subtree()
+                continue
+            if el.tag in _PRESERVE_WHITESPACE_TAGS:
+                depth += 1
+            if el.text:
+                texts.append(_collapse_whitespace(el.text, depth > 0))
+            continue
+        if event == 'end' and el.tag in _PRESERVE_WHITESPACE_TAGS:
+            depth -= 1
+        if el.tail and el is not top:
+            texts.append(_collapse_whitespace(el.tail, depth > 0))
+
+
+def _tree_text(parser: etree.HTMLParser) -> str:
+    """Close a fed parser and join its visible text nodes"""
+    try:
+        root = parser.close()
+    except etree.LxmlError:
+        # Empty or whitespace-only documents produce no tree
+        return ""
+    if root is None:
+        return ""
+    return "\n".join(_visible_text(root))
+
+
+def html_to_text(content: str) -> str:
+    """
+    Extract the text of an HTML document straight from an lxml tree.
+    Equivalent to BeautifulSoup(content, 'lxml').get_text("\n") without
+    wrapping every node in a Python object.
+    """
+    parser = etree.HTMLParser()
+    try:
+        parser.feed(content)
+    except etree.LxmlError:
+        return ""
+    return _tree_text(parser)
+
+
+def _feed_decoded(data, encoding: str) -> str:
+    """Decode data chunk by chunk into an lxml feed parser; raises UnicodeDecodeError"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    parser = etree.HTMLParser()
+    try:
+        for start in range(0, len(data), FEED_CHUNK_SIZE):
+            parser.feed(decoder.decode(data[start:start + FEED_CHUNK_SIZE]))
+        parser.feed(decoder.decode(b"", final=True))
+    except etree.LxmlError:
+        return ""
+    return _tree_text(parser)
+
+
+def html_file_to_text(file_path: str) -> Tuple[str, str]:
+    """
+    html_to_text for a file too large to hold as one str: the file is
+    memory-mapped and fed to lxml in decoded chunks, trying the same
+    encodings as try_read_with_encoding. Returns (text, encoding).
+    """
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        encodings = ["utf-8", "iso-8859-1"]
+        if data[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8:
+            encodings.insert(0, "utf-8-sig")
+        
+        for enc in encodings:
+            try:
+                return _feed_decoded(data, enc), enc
+            except UnicodeDecodeError:
+                continue
+    
+    # iso-8859-1 decodes any byte, so this is not reached
+    return "", "utf-8 (replace)"
 
 
 def clean_single_line(value: str) -> str:
     """Clean value to single line, removing extra whitespace"""
     if not value:
         return ""
-    value = value.splitlines()[0]
-    return re.sub(r'\s+', ' ', value).strip()
+    # str.split() collapses whitespace runs and trims, like re.sub(r'\s+', ' ', ...).strip()
+    return ' '.join(value.partition('\n')[0].split())
 
 
 def split_into_drive_sections(text: str) -> List[str]:
     """Split text into drive sections using boundary patterns"""
-    idx = []
-    for pat in SECTION_BOUNDARIES:
-        idx.extend(m.start() for m in pat.finditer(text))
-    idx = sorted(set(idx))
+    idx = [m.start() for m in SECTION_BOUNDARY_RE.finditer(text)]
     
     if not idx:
         # Fallback: split by blank lines
-        parts = re.split(r'\n\s*\n+', text)
-        return [p.strip() for p in parts if p.strip()]
+        # Each part is stripped once, then empties are dropped
+        parts = (p.strip() for p in BLANK_LINES_RE.split(text))
+        return [p for p in parts if p]
     
     sections = []
     for i, start in enumerate(idx):
@@ -97,22 +229,27 @@ def split_into_drive_sections(text: str) -> List[str]:
 
 
 def try_read_with_encoding(file_path: str) -> Tuple[str, str, List[str]]:
-    """Try to read file with multiple encodings"""
+    """Try to read file with multiple encodings; the bytes are read once and decoded in memory"""
     attempts = ["utf-8", "iso-8859-1", "cp1252"]
-    last_err = None
+    
+    with open(file_path, "rb", buffering=1 << 20) as f:
+        raw = f.read()
+    
+    # A UTF-8 BOM settles the question without trial decodes
+    if raw.startswith(codecs.BOM_UTF8):
+        try:
+            return universal_newlines(raw.decode("utf-8-sig")), "utf-8-sig", attempts
+        except UnicodeDecodeError:
+            pass
     
     for enc in attempts:
         try:
-            with open(file_path, "r", encoding=enc, errors="strict") as f:
-                return f.read(), enc, attempts
-        except Exception as e:
-            last_err = e
+            return universal_newlines(raw.decode(enc)), enc, attempts
+        except UnicodeDecodeError:
             continue
     
     # Fallback: read with replace
-    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-        content = f.read()
-    return content, "utf-8 (replace)", attempts
+    return universal_newlines(raw.decode("utf-8", errors="replace")), "utf-8 (replace)", attempts
 
 
 class HTMLParser(ParserBase):
@@ -121,27 +258,28 @@ class HTMLParser(ParserBase):
     def parse(self, file_path: str, file_name: str) -> List[Dict[str, Any]]:
         """Parse HTML file and extract drive information"""
         try:
-            # Try multiple encodings
-            content, used_encoding, attempted = try_read_with_encoding(file_path)
+            content = None
+            if os.path.getsize(file_path) > MMAP_THRESHOLD:
+                # Large report: never hold the whole decoded document as a str
+                text, used_encoding = html_file_to_text(file_path)
+            else:
+                # Try multiple encodings
+                content, used_encoding, attempted = try_read_with_encoding(file_path)
+                text = html_to_text(content)
             logger.info(f"Read {file_name} with encoding: {used_encoding}")
             
-            soup = BeautifulSoup(content, 'lxml')
-            
-            # Extract text from HTML
-            text = soup.get_text("\n", strip=False)
-            
             # Parse using text-based approach
             drives = self._parse_text_blob(text, file_name)
             
-            # If no drives found, try BeautifulSoup-based parsing
+            # If no drives found, try BeautifulSoup-based parsing; only this path walks the DOM
             if not drives:
                 logger.info(f"Text-based parsing failed for {file_name}, trying section-based parsing")
+                if content is None:
+                    content, used_encoding, attempted = try_read_with_encoding(file_path)
+                soup = BeautifulSoup(content, 'lxml')
                 drive_sections = self._find_drive_sections(soup)
-                
-                for section in drive_sections:
-                    drive_data = self._extract_drive_data(section, file_name)
-                    if drive_data and drive_data.get('VPD Serial'):
-                        drives.append(drive_data)
+                section_texts = [section.get_text() for section in drive_sections]
+                drives = [row for row in self._parse_text_blob(section_texts, file_name) if row['VPD Serial']]
             
             return drives if drives else [self._create_error_drive(file_name, "No recognizable drive blocks found")]
             
@@ -149,54 +287,53 @@ class HTMLParser(ParserBase):
             logger.error(f"Error parsing HTML file {file_name}: {e}")
             return [self._create_error_drive(file_name, str(e))]
     
-    def _parse_text_blob(self, text: str, file_name: str) -> List[Dict[str, Any]]:
-        """Parse text blob and extract drive information"""
+    def _parse_text_blob(self, text: Union[str, List[str]], file_name: str) -> List[Dict[str, Any]]:
+        """
+        Parse text and extract drive information.
+        A str is split into drive sections first; a list is taken as sections already.
+        """
         rows: List[Dict[str, Any]] = []
-        sections = split_into_drive_sections(text)
+        sections = split_into_drive_sections(text) if isinstance(text, str) else text
         
         for sec in sections:
             # Extract all fields using pattern matching
-            vpd = extract_first(SERIAL_PATTERNS, sec)
-            model = clean_single_line(extract_first(MODEL_PATTERNS, sec))
-            vendor_info = clean_single_line(extract_first(VENDOR_INFO_PATTERNS, sec))
-            health = extract_first(HEALTH_PATTERNS, sec)
-            realloc = extract_first(REALLOC_PATTERNS, sec)
-            grown = extract_first(GROWN_DEFECT_PATTERNS, sec)
+            fields = extract_fields(sec)
             
             # Only create a row if we have at least one key field
-            if any([vpd, model, health]):
-                label = vpd[:8] if vpd else ""
-                vendor = derive_vendor(model) if model else "Unknown"
-                
-                try:
-                    health_val = int(health) if health else 0
-                except Exception:
-                    health_val = 0
-                
-                try:
-                    realloc_val = int(realloc) if realloc else 0
-                except Exception:
-                    realloc_val = 0
-                
-                try:
-                    grown_val = int(grown) if grown else 0
-                except Exception:
-                    grown_val = 0
-                
-                rows.append({
-                    "Label Serial": label,
-                    "VPD Serial": vpd,
-                    "Model Number": model,
-                    "Vendor Information": vendor_info,
-                    "Vendor": vendor,
-                    "File Name": file_name,
-                    "Health Score": health_val,
-                    "Allocated Sections": realloc_val,
-                    "Grown Defects": grown_val,
-                })
+            if any([fields['serial'], fields['model'], fields['health']]):
+                rows.append(self._build_row(fields, file_name))
         
         return rows
     
+    def _build_row(self, fields: Dict[str, str], file_name: str) -> Dict[str, Any]:
+        """Turn extract_fields() output into an export row"""
+        vpd = fields['serial']
+        model = clean_single_line(fields['model'])
+        vendor_info = clean_single_line(fields['vendor_info'])
+        health = fields['health']
+        realloc = fields['realloc']
+        grown = fields['grown']
+        
+        label = vpd[:8] if vpd else ""
+        vendor = derive_vendor(model) if model else "Unknown"
+        
+        # Values come from \d captures, so int() cannot fail
+        health_val = int(health) if health else 0
+        realloc_val = int(realloc) if realloc else 0
+        grown_val = int(grown) if grown else 0
+        
+        return {
+            "Label Serial": label,
+            "VPD Serial": vpd,
+            "Model Number": model,
+            "Vendor Information": vendor_info,
+            "Vendor": vendor,
+            "File Name": file_name,
+            "Health Score": health_val,
+            "Allocated Sections": realloc_val,
+            "Grown Defects": grown_val,
+        }
+    
     def _find_drive_sections(self, soup: BeautifulSoup) -> List[BeautifulSoup]:
         """Find sections containing drive information"""
         sections = []
@@ -209,9 +346,7 @@ class HTMLParser(ParserBase):
                 sections.append(table)
         
         # Look for divs with drive-related classes
-        drive_divs = soup.find_all('div', class_=lambda x: x and any(
-            keyword in x.lower() for keyword in ['drive', 'disk', 'hard', 'section', 'block']
-        ))
+        drive_divs = soup.select(DRIVE_DIV_SELECTOR)
         for div in drive_divs:
             text = div.get_text().lower()
             if any(keyword in text for keyword in ['serial number', 'model id', 'health']):
@@ -259,108 +394,20 @@ class HTMLParser(ParserBase):
     
     def _extract_drive_data(self, section: BeautifulSoup, file_name: str) -> Dict[str, Any]:
         """Extract drive data from a section using enhanced pattern matching"""
-        text = section.get_text()
-        
-        # Use the improved extraction methods
-        vpd = extract_first(SERIAL_PATTERNS, text)
-        model = clean_single_line(extract_first(MODEL_PATTERNS, text))
-        vendor_info = clean_single_line(extract_first(VENDOR_INFO_PATTERNS, text))
-        health = extract_first(HEALTH_PATTERNS, text)
-        realloc = extract_first(REALLOC_PATTERNS, text)
-        grown = extract_first(GROWN_DEFECT_PATTERNS, text)
-        
-        label = vpd[:8] if vpd else ""
-        vendor = derive_vendor(model) if model else "Unknown"
-        
-        try:
-            health_val = int(health) if health else 0
-        except Exception:
-            health_val = 0
-        
-        try:
-            realloc_val = int(realloc) if realloc else 0
-        except Exception:
-            realloc_val = 0
-        
-        try:
-            grown_val = int(grown) if grown else 0
-        except Exception:
-            grown_val = 0
-        
-        return {
-            "Label Serial": label,
-            "VPD Serial": vpd,
-            "Model Number": model,
-            "Vendor Information": vendor_info,
-            "Vendor": vendor,
-            "File Name": file_name,
-            "Health Score": health_val,
-            "Allocated Sections": realloc_val,
-            "Grown Defects": grown_val,
-        }
+        return self._extract_drive_data_from_text(section.get_text(), file_name)
     
     def _alternative_parse(self, soup: BeautifulSoup, file_name: str) -> List[Dict[str, Any]]:
         """Alternative parsing method when standard sections aren't found"""
-        drives = []
         text = soup.get_text()
         
         # Split text into potential drive sections
         # Look for patterns that indicate drive boundaries
-        drive_patterns = [
-            r'Hard Disk Serial Number\s*:?\s*[A-Z0-9\-]{8,20}.*?(?=Hard Disk Serial Number|$)',
-            r'Model ID\s*:?\s*.+?(?=Model ID|$)',
-        ]
-        
-        for pattern in drive_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE | re.DOTALL)
-            for match in matches:
-                section_text = match.group(0)
-                drive_data = self._extract_drive_data_from_text(section_text, file_name)
-                if drive_data and drive_data.get('VPD Serial'):
-                    drives.append(drive_data)
-        
-        return drives
+        section_texts = [match.group(0) for pattern in ALT_DRIVE_PATTERNS for match in pattern.finditer(text)]
+        return [row for row in self._parse_text_blob(section_texts, file_name) if row['VPD Serial']]
     
     def _extract_drive_data_from_text(self, text: str, file_name: str) -> Dict[str, Any]:
         """Extract drive data from raw text"""
-        drive_data = self.get_default_drive_data(file_name)
-        
-        # Extract VPD Serial
-        serial_match = re.search(r'Hard Disk Serial Number\s*:?\s*([A-Z0-9\-]{8,20})', text, re.IGNORECASE)
-        if serial_match:
-            vpd_serial = serial_match.group(1).strip()
-            drive_data['VPD Serial'] = vpd_serial
-            drive_data['Label Serial'] = vpd_serial[:8] if len(vpd_serial) >= 8 else vpd_serial
-        
-        # Extract Model Number
-        model_match = re.search(r'Hard Disk Model ID\s*:?\s*(.+)', text, re.IGNORECASE)
-        if model_match:
-            model = model_match.group(1).strip()
-            drive_data['Model Number'] = model
-            drive_data['Vendor'] = derive_vendor(model)
-        
-        # Extract other fields using the same patterns as _extract_drive_data
-        vendor_info_match = re.search(r'Vendor Information\s*:?\s*(.+)', text, re.IGNORECASE)
-        if vendor_info_match:
-            drive_data['Vendor Information'] = vendor_info_match.group(1).strip()
-        
-        health_match = re.search(r'Health\s*:?\s*(\d+)\s*%?', text, re.IGNORECASE)
-        if health_match:
-            drive_data['Health Score'] = int(health_match.group(1))
-        
-        realloc_match = re.search(r'Reallocated Sector Count\s*:?\s*(\d+)', text, re.IGNORECASE)
-        if realloc_match:
-            drive_data['Allocated Sections'] = int(realloc_match.group(1))
-        
-        grown_match = re.search(r'Grown Defect(?: Count)?\s*:?\s*(\d+)', text, re.IGNORECASE)
-        if grown_match:
-            drive_data['Grown Defects'] = int(grown_match.group(1))
-        
-        interface_match = re.search(r'(?:Interface|Connection Type)\s*:?\s*([A-Za-z0-9\-/ ]+)', text, re.IGNORECASE)
-        if interface_match:
-            drive_data['Connection / Interface Type'] = interface_match.group(1).strip()
-        
-        return drive_data
+        return self._build_row(extract_fields(text), file_name)
     
     def _create_error_drive(self, file_name: str, error_message: str) -> Dict[str, Any]:
         """Create a drive entry for parsing errors"""
@@ -1,10 +1,13 @@
 # pdf_parser.py
 
+import io
+import itertools
 import logging
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
 
 from .base import ParserBase
+from .fields import FieldScanner
 from ..vendor import derive_vendor
 
 logger = logging.getLogger(__name__)
@@ -23,30 +26,38 @@ class PDFParser(ParserBase):
     - Leaves everything else at defaults from ParserBase.
     """
 
-    # --- Regex patterns (tolerant to spacing and separators) ---
-    _RE_SERIAL = [
-        re.compile(r"Serial\s*Number\s*=\s*([A-Z0-9\-]{8,64})", re.IGNORECASE),
-        re.compile(r"\bSerial\s*:\s*([A-Z0-9\-]{8,64})", re.IGNORECASE),
-    ]
-    _RE_MODEL = [
-        re.compile(r"\bProduct\s*=\s*([^\r\n]+)", re.IGNORECASE),
-        re.compile(r"\bProduct\s*:\s*([^\r\n]+)", re.IGNORECASE),
-        re.compile(r"Hard\s*Disk\s*Model\s*ID\s*[:=]\s*([^\r\n]+)", re.IGNORECASE),
-    ]
-    # Only the exact "Vendor Information" line; if missing, keep blank (per spec)
-    _RE_VENDOR_INFO = [
-        re.compile(r"Vendor\s*Information\s*[:=]\s*([^\r\n]+)", re.IGNORECASE),
-    ]
-    _RE_HEALTH = [
-        re.compile(r"Health\s*[:=]\s*(\d{1,3})\s*%?", re.IGNORECASE),
-    ]
-    _RE_GROWN_DEFECTS = [
-        re.compile(r"Number\s+of\s+Grown\s+Defects\s*=\s*(\d+)", re.IGNORECASE),
-        re.compile(r"Grown\s*Defect(?:s)?(?:\s*List)?(?:\s*Count)?\s*[:=]\s*(\d+)", re.IGNORECASE),
-    ]
-    _RE_REALLOC = [
-        re.compile(r"Reallocated\s*Sector(?:s)?(?:\s*Count)?\s*[:=]\s*(\d+)", re.IGNORECASE),
-    ]
+    # --- Regex patterns (tolerant to spacing and separators), per field in priority order ---
+    _FIELD_PATTERNS = {
+        "serial": [
+            r"Serial\s*Number\s*=\s*([A-Z0-9\-]{8,64})",
+            r"\bSerial\s*:\s*([A-Z0-9\-]{8,64})",
+        ],
+        "model": [
+            r"\bProduct\s*=\s*([^\r\n]+)",
+            r"\bProduct\s*:\s*([^\r\n]+)",
+            r"Hard\s*Disk\s*Model\s*ID\s*[:=]\s*([^\r\n]+)",
+        ],
+        # Only the exact "Vendor Information" line; if missing, keep blank (per spec)
+        "vendor_info": [
+            r"Vendor\s*Information\s*[:=]\s*([^\r\n]+)",
+        ],
+        "health": [
+            r"Health\s*[:=]\s*(\d{1,3})\s*%?",
+        ],
+        "grown": [
+            r"Number\s+of\s+Grown\s+Defects\s*=\s*(\d+)",
+            r"Grown\s*Defect(?:s)?(?:\s*List)?(?:\s*Count)?\s*[:=]\s*(\d+)",
+        ],
+        "realloc": [
+            r"Reallocated\s*Sector(?:s)?(?:\s*Count)?\s*[:=]\s*(\d+)",
+        ],
+    }
+    # One pass over the (possibly multi-page) text instead of one search per pattern
+    _SCANNER = FieldScanner(_FIELD_PATTERNS)
+    # Reading pages stops once these have their first-choice match (single-drive PDFs put them on page 1)
+    _STOP_FIELDS = ("serial", "model", "health", "grown")
+    # Trailing 2-4 character unit repeated at least twice (e.g., ...ECE4ECE4)
+    _REPEAT_SUFFIX_RE = re.compile(r"([A-Z0-9]{2,4})\1{1,}$")
 
     def parse(self, file_path: str, file_name: str) -> List[Dict[str, Any]]:
         """
@@ -54,12 +65,14 @@ class PDFParser(ParserBase):
         Signature preserved for compatibility with the rest of the application.
         """
         try:
-            text = self._extract_text_from_pdf(file_path)
-            if not text or not text.strip():
+            pages = self._iter_pdf_pages(file_path)
+            first = next((page for page in pages if page.strip()), None)
+            if first is None:
                 logger.warning("PDFParser: no text extracted from %s", file_name)
                 return [self._error_row(file_name, "No text could be extracted from PDF")]
 
-            row = self._extract_row_from_text(text, file_name)
+            fields = self._SCANNER.extract_chunks(itertools.chain([first], pages), self._STOP_FIELDS)
+            row = self._row_from_fields(fields, file_name)
             # If everything is empty, emit a placeholder error row
             if not any([row.get("VPD Serial"), row.get("Model Number"), row.get("Health Score") is not None]):
                 return [self._error_row(file_name, "No recognizable fields found")]
@@ -76,36 +89,61 @@ class PDFParser(ParserBase):
         row["Vendor Information"] = f"Parsing Error: {msg}"
         return row
 
-    def _extract_text_from_pdf(self, file_path: str) -> str:
+    def _iter_pdf_pages(self, file_path: str) -> Iterator[str]:
         """
-        Extract text using pdfminer.six if available; else fall back to PyPDF2.
+        Yield the PDF text page by page using PyMuPDF if installed, else pdfminer.six,
+        else PyPDF2; the chunks concatenate to the backend's full-document text.
+        If a backend fails part-way, the next one resumes after the pages already yielded.
         """
-        # Preferred: pdfminer.six
-        try:
-            from pdfminer.high_level import extract_text  # type: ignore
-            return extract_text(file_path)
-        except Exception as e:
-            logger.info("PDFParser: pdfminer not available or failed (%s); trying PyPDF2", e)
-
+        yielded = 0
+        for name, backend in (("PyMuPDF", self._fitz_pages),
+                              ("pdfminer", self._pdfminer_pages),
+                              ("PyPDF2", self._pypdf2_pages)):
+            try:
+                for index, text in enumerate(backend(file_path)):
+                    if index >= yielded:
+                        yielded += 1
+                        yield text
+                return
+            except Exception as e:
+                logger.info("PDFParser: %s not available or failed (%s)", name, e)
+        logger.warning("PDFParser: no PDF backend could read %s", file_path)
+
+    @staticmethod
+    def _fitz_pages(file_path: str) -> Iterator[str]:
+        # Fastest: PyMuPDF (optional; not in requirements because of its AGPL licence)
+        import fitz  # type: ignore
+        with fitz.open(file_path) as doc:
+            for number, page in enumerate(doc):
+                yield ("\n" if number else "") + page.get_text("text")
+
+    @staticmethod
+    def _pdfminer_pages(file_path: str) -> Iterator[str]:
+        # Preferred: pdfminer.six. Same pipeline and LAParams as
+        # pdfminer.high_level.extract_text (detect_vertical and all_texts are
+        # pdfminer's defaults, spelled out), drained after every page.
+        from pdfminer.converter import TextConverter  # type: ignore
+        from pdfminer.layout import LAParams  # type: ignore
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager  # type: ignore
+        from pdfminer.pdfpage import PDFPage  # type: ignore
+        with open(file_path, "rb") as f, io.StringIO() as output:
+            rsrcmgr = PDFResourceManager(caching=True)
+            device = TextConverter(rsrcmgr, output, laparams=LAParams(detect_vertical=False, all_texts=False))
+            interpreter = PDFPageInterpreter(rsrcmgr, device)
+            for page in PDFPage.get_pages(f, caching=True):
+                interpreter.process_page(page)
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate()
+
+    @staticmethod
+    def _pypdf2_pages(file_path: str) -> Iterator[str]:
         # Fallback: PyPDF2
-        try:
-            import PyPDF2  # type: ignore
-            chunks = []
-            with open(file_path, "rb") as f:
-                reader = PyPDF2.PdfReader(f)
-                for page in reader.pages:
-                    chunks.append(page.extract_text() or "")
-            return "\n".join(chunks)
-        except Exception as e:
-            logger.warning("PDFParser: PyPDF2 not available or failed (%s)", e)
-            return ""
-
-    def _first(self, patterns, s: str) -> str:
-        for pat in patterns:
-            m = pat.search(s)
-            if m:
-                return (m.group(1) or "").strip()
-        return ""
+        import PyPDF2  # type: ignore
+        with open(file_path, "rb") as f:
+            reader = PyPDF2.PdfReader(f)
+            for number, page in enumerate(reader.pages):
+                yield ("\n" if number else "") + (page.extract_text() or "")
 
     def _trim_serial_suffix(self, serial: str) -> str:
         """
@@ -114,19 +152,25 @@ class PDFParser(ParserBase):
         """
         if not serial:
             return ""
-        s = re.sub(r"\s+", "", serial.strip().upper())
-        m = re.search(r"([A-Z0-9]{2,4})\1{1,}$", s)
-        return s[:m.start()] if (m and len(s) >= 12) else s
+        s = "".join(serial.upper().split())
+        if len(s) < 12:
+            # Short serials are never trimmed; skip the regex
+            return s
+        m = self._REPEAT_SUFFIX_RE.search(s)
+        return s[:m.start()] if m else s
 
     def _extract_row_from_text(self, text: str, file_name: str) -> Dict[str, Any]:
+        return self._row_from_fields(self._SCANNER.extract(text), file_name)
+
+    def _row_from_fields(self, fields: Dict[str, str], file_name: str) -> Dict[str, Any]:
         row = self.get_default_drive_data(file_name)
 
-        serial = self._first(self._RE_SERIAL, text)
-        model = self._first(self._RE_MODEL, text)
-        vendor_info = self._first(self._RE_VENDOR_INFO, text)
-        health = self._first(self._RE_HEALTH, text)
-        grown = self._first(self._RE_GROWN_DEFECTS, text)
-        realloc = self._first(self._RE_REALLOC, text)
+        serial = fields["serial"]
+        model = fields["model"]
+        vendor_info = fields["vendor_info"]
+        health = fields["health"]
+        grown = fields["grown"]
+        realloc = fields["realloc"]
 
         serial = self._trim_serial_suffix(serial)
 
@@ -136,17 +180,9 @@ class PDFParser(ParserBase):
         row["Vendor Information"] = vendor_info  # leave blank if not present
         row["Vendor"] = derive_vendor(model) if model else "Unknown"
 
-        try:
-            row["Health Score"] = int(health) if health else None
-        except Exception:
-            row["Health Score"] = None
-        try:
-            row["Allocated Sections"] = int(realloc) if realloc else 0
-        except Exception:
-            row["Allocated Sections"] = 0
-        try:
-            row["Grown Defects"] = int(grown) if grown else 0
-        except Exception:
-            row["Grown Defects"] = 0
+        # Values come from \d captures, so int() cannot fail
+        row["Health Score"] = int(health) if health else None
+        row["Allocated Sections"] = int(realloc) if realloc else 0
+        row["Grown Defects"] = int(grown) if grown else 0
 
         return row
@@ -4,10 +4,52 @@ import logging
 from typing import List, Dict, Any, Tuple
 
 from .base import ParserBase
+from .fields import FieldScanner
+from ..encoding import universal_newlines
 from ..vendor import derive_vendor
 
 logger = logging.getLogger(__name__)
 
+# Field regexes (scoped within a block), per field in priority order
+_FIELD_PATTERNS = {
+    "serial": [
+        r"Hard\s*Disk\s*Serial\s*Number\s*(?:\s*\.\s*)*:\s*([A-Z0-9\-\s]{6,40})",
+        r"\bVPD\s*Serial\s*(?:\s*\.\s*)*:\s*([A-Z0-9\-\s]{6,40})",
+        r"\bSerial\s*Number\s*(?:\s*\.\s*)*:\s*([A-Z0-9\-\s]{6,40})",
+    ],
+    "model": [
+        r"Hard\s*Disk\s*Model\s*ID\s*(?:\s*\.\s*)*:\s*(.+)$",
+        r"\bModel\s*ID\s*(?:\s*\.\s*)*:\s*(.+)$",
+        r"\bModel\s*(?:\s*\.\s*)*:\s*(.+)$",
+    ],
+    "vendor_info": [
+        r"Vendor\s*Information\s*(?:\s*\.\s*)*:\s*(.+)$",
+        r"\bVendor\s*(?:\s*\.\s*)*:\s*(.+)$",
+        r"\bManufacturer\s*(?:\s*\.\s*)*:\s*(.+)$",
+    ],
+    "health": [
+        r"Health\s*(?:\s*\.\s*)*:\s*[#\s\-\u2588]*\s*(\d{1,3})\s*%?",
+        r"Health\s*Score\s*(?:\s*\.\s*)*:\s*(\d{1,3})\s*%?",
+        r"Overall\s*Health\s*(?:\s*\.\s*)*:\s*(\d{1,3})\s*%?",
+    ],
+    # Accept truncations like "Reallocated Sectors Co.." produced by fixed-width renderings
+    "realloc": [
+        r"Reallocated\s*Sector(?:s)?\s*(?:Count|Co\.\.)\s*(?:\s*\.\s*)*:\s*(\d+)",
+        r"\bReallocated\s*Sectors?\s*(?:\s*\.\s*)*:\s*(\d+)",
+        r"\bReallocated\s*(?:\s*\.\s*)*:\s*(\d+)",
+    ],
+    "grown": [
+        r"Grown\s*Defect(?:s)?(?:\s*List)?(?:\s*Count)?\s*(?:\s*\.\s*)*:\s*(\d+)",
+        r"\bGrown\s*Defects?\s*(?:\s*\.\s*)*:\s*(\d+)",
+        r"\bDefect\s*Count\s*(?:\s*\.\s*)*:\s*(\d+)",
+    ],
+}
+# One pass per block instead of up to 18 searches; MULTILINE only affects the "(.+)$" captures
+_SCANNER = FieldScanner(_FIELD_PATTERNS, re.IGNORECASE | re.MULTILINE)
+
+# Trailing 2-4 character unit repeated at least twice (e.g., ...ECE4ECE4)
+_REPEAT_SUFFIX_RE = re.compile(r"([A-Z0-9]{2,4})\1{1,}$")
+
 
 class TXTParser(ParserBase):
     """Parser for TXT Hard Disk Sentinel reports (robust, block-based)."""
@@ -54,80 +96,37 @@ class TXTParser(ParserBase):
     # ----------------------------
     def _fallback_try_encodings(self, path: str) -> Tuple[str, str, List[str]]:
         attempts = ["utf-8", "iso-8859-1", "cp1252"]
-        last_err = None
+        # Read once; each attempt only decodes the same bytes (newlines as text mode would)
+        with open(path, "rb") as f:
+            data = f.read()
         for enc in attempts:
             try:
-                with open(path, "r", encoding=enc, errors="strict") as f:
-                    return f.read(), enc, attempts
-            except Exception as e:
-                last_err = e
+                return universal_newlines(data.decode(enc)), enc, attempts
+            except UnicodeDecodeError:
                 continue
         # final permissive fallback
-        with open(path, "r", encoding="utf-8", errors="replace") as f:
-            return f.read(), "utf-8 (replace)", attempts
-
-    # Disk block delimiter: start at a "Hard Disk Summary" header
-    _BLOCK_START = re.compile(r"^\s*Hard\s+Disk\s+Summary\s*\n[-\s]+\n", re.IGNORECASE | re.MULTILINE)
-
-    # Field regexes (scoped within a block)
-    _RE_SERIALS = [
-        re.compile(r"Hard\s*Disk\s*Serial\s*Number\s*(?:\s*\.\s*)*:\s*([A-Z0-9\-\s]{6,40})", re.IGNORECASE),
-        re.compile(r"\bVPD\s*Serial\s*(?:\s*\.\s*)*:\s*([A-Z0-9\-\s]{6,40})", re.IGNORECASE),
-        re.compile(r"\bSerial\s*Number\s*(?:\s*\.\s*)*:\s*([A-Z0-9\-\s]{6,40})", re.IGNORECASE),
-    ]
-    _RE_MODEL = [
-        re.compile(r"Hard\s*Disk\s*Model\s*ID\s*(?:\s*\.\s*)*:\s*(.+)$", re.IGNORECASE | re.MULTILINE),
-        re.compile(r"\bModel\s*ID\s*(?:\s*\.\s*)*:\s*(.+)$", re.IGNORECASE | re.MULTILINE),
-        re.compile(r"\bModel\s*(?:\s*\.\s*)*:\s*(.+)$", re.IGNORECASE | re.MULTILINE),
-    ]
-    _RE_VENDOR_INFO = [
-        re.compile(r"Vendor\s*Information\s*(?:\s*\.\s*)*:\s*(.+)$", re.IGNORECASE | re.MULTILINE),
-        re.compile(r"\bVendor\s*(?:\s*\.\s*)*:\s*(.+)$", re.IGNORECASE | re.MULTILINE),
-        re.compile(r"\bManufacturer\s*(?:\s*\.\s*)*:\s*(.+)$", re.IGNORECASE | re.MULTILINE),
-    ]
-    _RE_HEALTH = [
-        re.compile(r"Health\s*(?:\s*\.\s*)*:\s*[#\s\-\u2588]*\s*(\d{1,3})\s*%?", re.IGNORECASE),
-        re.compile(r"Health\s*Score\s*(?:\s*\.\s*)*:\s*(\d{1,3})\s*%?", re.IGNORECASE),
-        re.compile(r"Overall\s*Health\s*(?:\s*\.\s*)*:\s*(\d{1,3})\s*%?", re.IGNORECASE),
-    ]
-    # Accept truncations like "Reallocated Sectors Co.." produced by fixed-width renderings
-    _RE_REALLOC = [
-        re.compile(r"Reallocated\s*Sector(?:s)?\s*(?:Count|Co\.\.)\s*(?:\s*\.\s*)*:\s*(\d+)", re.IGNORECASE),
-        re.compile(r"\bReallocated\s*Sectors?\s*(?:\s*\.\s*)*:\s*(\d+)", re.IGNORECASE),
-        re.compile(r"\bReallocated\s*(?:\s*\.\s*)*:\s*(\d+)", re.IGNORECASE),
-    ]
-    _RE_GROWN = [
-        re.compile(r"Grown\s*Defect(?:s)?(?:\s*List)?(?:\s*Count)?\s*(?:\s*\.\s*)*:\s*(\d+)", re.IGNORECASE),
-        re.compile(r"\bGrown\s*Defects?\s*(?:\s*\.\s*)*:\s*(\d+)", re.IGNORECASE),
-        re.compile(r"\bDefect\s*Count\s*(?:\s*\.\s*)*:\s*(\d+)", re.IGNORECASE),
-    ]
+        return universal_newlines(data.decode("utf-8", errors="replace")), "utf-8 (replace)", attempts
+
+    # Disk block delimiter: start at a "Hard Disk Summary" header (zero-width, so split() keeps it)
+    _BLOCK_START = re.compile(r"(?=^\s*Hard\s+Disk\s+Summary\s*\n[-\s]+\n)", re.IGNORECASE | re.MULTILINE)
+    # Fallback delimiter when no header is present: runs of three or more line breaks
+    _BLANK_BLOCKS = re.compile(r"\n\s*\n{2,}")
 
     def _split_blocks(self, text: str) -> List[str]:
         """Split the report into per-disk blocks based on the 'Hard Disk Summary' header."""
-        starts = [m.start() for m in self._BLOCK_START.finditer(text)]
-        if not starts:
+        parts = self._BLOCK_START.split(text)
+        if len(parts) == 1:
             # fallback: try very large blank-line splits
-            parts = re.split(r"\n\s*\n{2,}", text)
+            parts = self._BLANK_BLOCKS.split(text)
             return [p for p in (s.strip() for s in parts) if p]
-        blocks = []
-        for i, s in enumerate(starts):
-            e = starts[i + 1] if i + 1 < len(starts) else len(text)
-            blk = text[s:e].strip()
-            if blk:
-                blocks.append(blk)
-        return blocks
-
-    def _first(self, patterns: List[re.Pattern], s: str) -> str:
-        for pat in patterns:
-            m = pat.search(s)
-            if m:
-                return m.group(1).strip()
-        return ""
+        # parts[0] is whatever precedes the first header
+        return [blk for blk in (p.strip() for p in parts[1:]) if blk]
 
     def _clean_single_line(self, s: str) -> str:
         if not s:
             return ""
-        return re.sub(r"\s+", " ", s.strip())
+        # str.split() collapses whitespace runs and trims, like re.sub(r"\s+", " ", ...).strip()
+        return " ".join(s.split())
 
     def _trim_repeating_suffix(self, serial: str) -> str:
         """
@@ -136,10 +135,10 @@ class TXTParser(ParserBase):
         trim it but keep the leading core. Only apply when it lengthens the serial
         beyond ~12 chars to avoid over-trimming short serials.
         """
-        s = (serial or "").strip().upper()
-        s = re.sub(r"\s+", "", s)  # remove spaces
-        m = re.search(r"([A-Z0-9]{2,4})\1{1,}$", s)
-        if m and len(s) >= 12:
+        s = "".join((serial or "").upper().split())  # remove spaces
+        # Short serials are never trimmed, so skip the regex for them
+        m = _REPEAT_SUFFIX_RE.search(s) if len(s) >= 12 else None
+        if m:
             core = s[:m.start()]
             result = core if core else s
         else:
@@ -152,33 +151,20 @@ class TXTParser(ParserBase):
         Extract required fields from a single disk block.
         Keep this method name/signature for compatibility with existing code.
         """
-        serial_raw = self._first(self._RE_SERIALS, block)
-        model = self._first(self._RE_MODEL, block)
-        vendor_info = self._first(self._RE_VENDOR_INFO, block)
-        health = self._first(self._RE_HEALTH, block)
-        realloc = self._first(self._RE_REALLOC, block)
-        grown = self._first(self._RE_GROWN, block)
+        fields = _SCANNER.extract(block)
+        serial_raw = fields["serial"]
+        model = fields["model"]
+        vendor_info = fields["vendor_info"]
+        health = fields["health"]
+        realloc = fields["realloc"]
+        grown = fields["grown"]
 
         serial = self._trim_repeating_suffix(serial_raw) if serial_raw else ""
         model = self._clean_single_line(model)
         vendor_info = self._clean_single_line(vendor_info)
 
-        # Prepare default structure (from ParserBase if available)
-        try:
-            drive = self.get_default_drive_data(file_name)  # Provided by ParserBase
-        except Exception:
-            # Fallback shape to match orchestrator columns
-            drive = {
-                "Label Serial": "",
-                "VPD Serial": "",
-                "Model Number": "",
-                "Vendor Information": "",
-                "Vendor": "Unknown",
-                "File Name": file_name,
-                "Health Score": None,
-                "Allocated Sections": 0,
-                "Grown Defects": 0,
-            }
+        # Default structure, copied from ParserBase's template
+        drive = self.get_default_drive_data(file_name)
 
         drive["VPD Serial"] = serial
         drive["Label Serial"] = serial[:8] if serial else ""
@@ -203,19 +189,6 @@ class TXTParser(ParserBase):
 
     def _create_error_drive(self, file_name: str, error_message: str) -> Dict[str, Any]:
         """Create a drive entry for parsing errors (keep signature)."""
-        try:
-            drive_data = self.get_default_drive_data(file_name)
-        except Exception:
-            drive_data = {
-                "Label Serial": "",
-                "VPD Serial": "",
-                "Model Number": "",
-                "Vendor Information": "",
-                "Vendor": "Unknown",
-                "File Name": file_name,
-                "Health Score": None,
-                "Allocated Sections": 0,
-                "Grown Defects": 0,
-            }
+        drive_data = self.get_default_drive_data(file_name)
         drive_data["Vendor Information"] = f"Parsing Error: {error_message}"
         return drive_data
@@ -1,3 +1,17 @@
+# Model number prefixes (upper case) per vendor, looked up by length
+_VENDOR_PREFIXES_2 = {
+    'ST': 'Seagate',
+    'WD': 'Western Digital',
+    'DT': 'Toshiba',
+    'MG': 'Toshiba',
+}
+_VENDOR_PREFIXES_3 = {
+    'HUA': 'Hitachi',
+    'HUS': 'Hitachi',
+    'IBM': 'IBM',
+}
+
+
 def derive_vendor(model_number: str) -> str:
     """
     Derive vendor from model number prefix.
@@ -6,17 +20,7 @@ def derive_vendor(model_number: str) -> str:
     if not model_number:
         return 'Unknown'
     
-    model_upper = model_number.upper().strip()
+    # Only the first three characters matter; upper() never shortens a string
+    prefix = model_number.lstrip()[:3].upper()
     
-    if model_upper.startswith('ST'):
-        return 'Seagate'
-    elif model_upper.startswith('WD'):
-        return 'Western Digital'
-    elif model_upper.startswith(('DT', 'MG')):
-        return 'Toshiba'
-    elif model_upper.startswith(('HUA', 'HUS')):
-        return 'Hitachi'
-    elif model_upper.startswith('IBM'):
-        return 'IBM'
-    else:
-        return 'Unknown'
+    return _VENDOR_PREFIXES_2.get(prefix[:2]) or _VENDOR_PREFIXES_3.get(prefix[:3], 'Unknown')
@@ -3,17 +3,25 @@ import logging
 import zipfile
 import tempfile
 import shutil
-from pathlib import Path
 from django.conf import settings
+from django.core.cache import cache
 from django.core.files.base import ContentFile
+from django.db import transaction
 from django.utils import timezone
 from celery import shared_task
-from .models import ParsingJob, ParseError
-from .services import FileCollector, ExcelWriter, HTMLParser, TXTParser, PDFParser
+from kombu.exceptions import OperationalError as BrokerError
+from .models import ParsingJob
+from .services import FileCollector, ExcelWriter, bulk_save_errors, parse_many
+from .services.collector import ZIP_SIGNATURES
 
 logger = logging.getLogger(__name__)
 
 
+def job_status_cache_key(job_id) -> str:
+    """Cache key of the job columns job_status_api polls"""
+    return f"jobstatus:{job_id}"
+
+
 def _is_zip_file(file_path: str) -> bool:
     """Check if file is a zip file"""
     try:
@@ -23,7 +31,10 @@ def _is_zip_file(file_path: str) -> bool:
 
 
 def _extract_zip(zip_path: str, extract_dir: str) -> list:
-    """Recursively extract zip files"""
+    """
+    Recursively extract zip files.
+    Members are filtered before extraction, so unsupported files are never written.
+    """
     extracted_files = []
     supported_extensions = {'.html', '.txt', '.pdf'}
     
@@ -34,26 +45,24 @@ def _extract_zip(zip_path: str, extract_dir: str) -> list:
                 if member.endswith('/') or member.startswith('.') or member.startswith('__MACOSX'):
                     continue
                 
+                # Nested zips are recognised by their magic bytes, whatever their name
+                with zip_ref.open(member) as src:
+                    is_zip = src.read(4).startswith(ZIP_SIGNATURES)
+                if not is_zip and os.path.splitext(member)[1].lower() not in supported_extensions:
+                    logger.debug(f"Skipping unsupported file: {member}")
+                    continue
+                
                 # Extract file
-                zip_ref.extract(member, extract_dir)
-                extracted_path = os.path.join(extract_dir, member)
+                extracted_path = zip_ref.extract(member, extract_dir)
                 
-                # Check if extracted file is another zip
-                if _is_zip_file(extracted_path):
+                if is_zip:
                     # Recursively extract nested zip
                     nested_files = _extract_zip(extracted_path, extract_dir)
                     extracted_files.extend(nested_files)
                     # Remove the zip file after extraction
                     os.remove(extracted_path)
                 else:
-                    # Check if it's a supported file type
-                    file_ext = Path(extracted_path).suffix.lower()
-                    if file_ext in supported_extensions:
-                        extracted_files.append(extracted_path)
-                    else:
-                        # Remove unsupported files
-                        logger.debug(f"Removing unsupported file: {extracted_path}")
-                        os.remove(extracted_path)
+                    extracted_files.append(extracted_path)
     
     except Exception as e:
         logger.error(f"Error extracting zip file {zip_path}: {e}")
@@ -81,6 +90,7 @@ def process_files_task(self, job_id, file_paths):
         job.started_at = timezone.now()
         job.task_id = self.request.id
         job.save()
+        cache.delete(job_status_cache_key(job_id))
         
         logger.info(f"Starting processing for job {job_id}")
         
@@ -116,46 +126,32 @@ def process_files_task(self, job_id, file_paths):
         
         logger.info(f"Processing {len(files_to_process)} file(s) total")
         
-        # Parse files
+        # Parse serially in this process: a Celery prefork child is daemonic and
+        # may not start a process pool (parse_many would go serial regardless)
         all_drives = []
-        
+        existing_files = []
         for file_path in files_to_process:
-            try:
-                if not os.path.exists(file_path):
-                    logger.warning(f"File not found: {file_path}")
-                    continue
-                    
-                file_name = os.path.basename(file_path)
-                file_ext = Path(file_path).suffix.lower()
-                
-                # Choose parser based on file extension
-                if file_ext == '.html':
-                    parser = HTMLParser()
-                elif file_ext == '.txt':
-                    parser = TXTParser()
-                elif file_ext == '.pdf':
-                    parser = PDFParser()
-                else:
-                    logger.warning(f"Unknown file extension: {file_ext}")
-                    continue
-                
-                # Parse file
-                drives = parser.parse(file_path, file_name)
-                all_drives.extend(drives)
-                
-            except Exception as e:
-                logger.error(f"Error parsing file {file_path}: {e}")
+            if os.path.exists(file_path):
+                existing_files.append(file_path)
+            else:
+                logger.warning(f"File not found: {file_path}")
+        
+        pairs = [(file_path, os.path.basename(file_path)) for file_path in existing_files]
+        for (file_path, file_name), (drives, error) in zip(pairs, parse_many(pairs, max_workers=1)):
+            if error is not None:
                 parse_errors.append({
-                    'file_name': os.path.basename(file_path),
-                    'error_message': str(e),
+                    'file_name': file_name,
+                    'error_message': error,
                     'encodings_tried': []
                 })
+            all_drives.extend(drives)
         
-        # Deduplicate drives
+        # Build the export frame once and deduplicate it in place
         collector = FileCollector()
-        original_count = len(all_drives)
-        unique_drives = collector.deduplicate_drives(all_drives)
-        duplicates_removed = original_count - len(unique_drives)
+        excel_writer = ExcelWriter()
+        drives_df = excel_writer.create_dataframe(all_drives)
+        unique_drives = collector.deduplicate_drives(drives_df)
+        duplicates_removed = len(drives_df) - len(unique_drives)
         
         # Generate output files
         first_file_name = os.path.basename(file_paths[0]).split('.')[0] if file_paths else 'report'
@@ -166,33 +162,29 @@ def process_files_task(self, job_id, file_paths):
         os.makedirs(output_dir, exist_ok=True)
         
         excel_path = os.path.join(output_dir, f"{output_base}.xlsx")
-        csv_path = os.path.join(output_dir, f"{output_base}.csv")
         
-        # Write Excel file
-        excel_writer = ExcelWriter()
+        parquet_path = os.path.join(output_dir, f"{output_base}.parquet")
+        
+        # Write Excel file; the CSV is generated on first download
         excel_writer.write_excel(unique_drives, excel_path, parse_errors)
         
-        # Write CSV file
-        excel_writer.write_csv(unique_drives, csv_path)
+        # Keep the drives in Parquet so other formats can be rebuilt cheaply
+        excel_writer.write_parquet(unique_drives, parquet_path)
         
         # Update job with results
         job.result_excel = f"results/{output_base}.xlsx"
-        job.result_csv = f"results/{output_base}.csv"
+        job.result_parquet = f"results/{output_base}.parquet"
         job.total_files = len(file_paths)
         job.total_drives = len(unique_drives)
         job.duplicates_removed = duplicates_removed
         job.status = 'COMPLETED'
         job.completed_at = timezone.now()
-        job.save()
         
-        # Save parse errors to database
-        for error in parse_errors:
-            ParseError.objects.create(
-                job=job,
-                file_name=error['file_name'],
-                error_message=error['error_message'],
-                encodings_tried=error['encodings_tried']
-            )
+        # Completion and its parse errors become visible together
+        with transaction.atomic():
+            job.save()
+            bulk_save_errors(job, parse_errors)
+        cache.delete(job_status_cache_key(job_id))
         
         logger.info(f"Successfully completed job {job_id}")
         return {
@@ -214,6 +206,7 @@ def process_files_task(self, job_id, file_paths):
             job.error_message = str(e)
             job.completed_at = timezone.now()
             job.save()
+            cache.delete(job_status_cache_key(job_id))
         except Exception as save_error:
             logger.error(f"Failed to save error status: {save_error}")
         
@@ -224,32 +217,54 @@ def process_files_task(self, job_id, file_paths):
         # ALWAYS clean up files, regardless of success or failure
         logger.info(f"Cleaning up input files for job {job_id}")
         
-        # Clean up all original uploaded files
+        # Clean up all original uploaded files; a missing file needs no stat() first
         for file_path in original_uploaded_files:
             try:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-                    logger.debug(f"Deleted original file: {file_path}")
+                os.remove(file_path)
+                logger.debug(f"Deleted original file: {file_path}")
+            except FileNotFoundError:
+                pass
             except Exception as e:
                 logger.warning(f"Failed to delete original file {file_path}: {e}")
         
         # Clean up all processed/extracted files
         for file_path in files_to_process:
             try:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-                    logger.debug(f"Deleted processed file: {file_path}")
+                os.remove(file_path)
+                logger.debug(f"Deleted processed file: {file_path}")
+            except FileNotFoundError:
+                pass
             except Exception as e:
                 logger.warning(f"Failed to delete processed file {file_path}: {e}")
         
         # Clean up extraction directory
         if extract_dir:
             try:
-                if os.path.exists(extract_dir):
-                    shutil.rmtree(extract_dir)
-                    logger.debug(f"Deleted extraction directory: {extract_dir}")
+                shutil.rmtree(extract_dir)
+                logger.debug(f"Deleted extraction directory: {extract_dir}")
+            except FileNotFoundError:
+                pass
             except Exception as e:
                 logger.warning(f"Failed to delete extraction directory {extract_dir}: {e}")
         
         logger.info(f"File cleanup completed for job {job_id}")
 
+
+@shared_task(ignore_result=True)
+def requeue_pending_local_jobs():
+    """
+    Queue jobs submitted while the broker was down (status PENDING_LOCAL).
+    Scheduled by Celery beat, so it only runs once the broker is reachable again.
+    """
+    for job in ParsingJob.objects.filter(status='PENDING_LOCAL').only('id', 'input_paths'):
+        # Claim the job first so overlapping runs never queue it twice
+        if not ParsingJob.objects.filter(id=job.id, status='PENDING_LOCAL').update(status='PENDING'):
+            continue
+        try:
+            process_files_task.delay(str(job.id), job.input_paths)
+        except BrokerError as e:
+            ParsingJob.objects.filter(id=job.id).update(status='PENDING_LOCAL')
+            logger.warning(f"Broker unavailable, requeue of job {job.id} deferred: {e}")
+            return
+        cache.delete(job_status_cache_key(job.id))
+        logger.info(f"Requeued job {job.id} with {len(job.input_paths)} files")
@@ -13,7 +13,7 @@ class TestExcelWriter(TestCase):
     
     def test_create_dataframe_empty(self):
         """Test creating DataFrame with empty data"""
-        df = self.writer._create_dataframe([])
+        df = self.writer.create_dataframe([])
         
         self.assertEqual(len(df), 0)
         self.assertEqual(list(df.columns), self.writer.required_columns)
@@ -37,7 +37,7 @@ class TestExcelWriter(TestCase):
             }
         ]
         
-        df = self.writer._create_dataframe(drives)
+        df = self.writer.create_dataframe(drives)
         
         self.assertEqual(len(df), 2)
         self.assertEqual(df.iloc[0]['VPD Serial'], 'WD12345678901234567890')
@@ -45,6 +45,18 @@ class TestExcelWriter(TestCase):
         self.assertEqual(df.iloc[0]['Vendor'], 'Western Digital')
         self.assertEqual(df.iloc[1]['Vendor'], 'Seagate')
     
+    def test_create_dataframe_from_frame(self):
+        """Test a DataFrame is reordered and padded to the required columns"""
+        import pandas as pd
+        frame = pd.DataFrame([{'Vendor': 'Seagate', 'VPD Serial': 'ST1', 'Extra': 'x'}])
+        
+        df = self.writer.create_dataframe(frame)
+        
+        self.assertEqual(list(df.columns), self.writer.required_columns)
+        self.assertEqual(df.iloc[0]['VPD Serial'], 'ST1')
+        self.assertEqual(df.iloc[0]['Vendor'], 'Seagate')
+        self.assertEqual(df.iloc[0]['Label Serial'], '')
+    
     def test_write_excel_file(self):
         """Test writing Excel file"""
         drives = [
@@ -143,3 +155,75 @@ class TestExcelWriter(TestCase):
         finally:
             if os.path.exists(output_path):
                 os.unlink(output_path)
+    
+    def test_health_formatting_skips_blank_and_text(self):
+        """Test Health Score color rules only match numeric cells"""
+        drives = [
+            {'VPD Serial': 'A', 'Health Score': 97},
+            {'VPD Serial': 'B', 'Health Score': None},
+            {'VPD Serial': 'C', 'Health Score': 'n/a'},
+        ]
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = os.path.join(temp_dir, 'out.xlsx')
+            self.writer.write_excel(drives, output_path)
+        
+            from openpyxl import load_workbook
+            ws = load_workbook(output_path)['Drive Summary']
+            rules = [
+                (str(cf.sqref), rule)
+                for cf in ws.conditional_formatting
+                for rule in cf.rules
+            ]
+        
+        self.assertIsNone(ws['G3'].value)
+        self.assertEqual(len(rules), 3)
+        for sqref, rule in rules:
+            self.assertEqual(sqref, 'G2:G4')
+            self.assertEqual(rule.type, 'expression')
+            self.assertTrue(rule.formula[0].startswith('AND(ISNUMBER(G2),'))
+    
+    def test_excel_to_csv(self):
+        """Test generating CSV from a written workbook"""
+        drives = [
+            {
+                'VPD Serial': '0012345',
+                'Model Number': 'WD Blue 1TB',
+                'Health Score': 95,
+                'File Name': 'test.txt',
+                'Vendor': 'Western Digital',
+                'Label Serial': '',
+                'Vendor Information': 'Western Digital Corporation',
+                'Allocated Sections': 0,
+                'Grown Defects': 0
+            }
+        ]
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            excel_path = os.path.join(temp_dir, 'out.xlsx')
+            csv_path = os.path.join(temp_dir, 'out.csv')
+            self.writer.write_excel(drives, excel_path)
+            self.writer.excel_to_csv(excel_path, csv_path)
+            
+            with open(csv_path, encoding='utf-8') as f:
+                lines = f.read().splitlines()
+            
+            self.assertEqual(lines[0], ','.join(self.writer.required_columns))
+            self.assertEqual(lines[1], ',0012345,WD Blue 1TB,Western Digital Corporation,Western Digital,test.txt,95,0,0')
+    
+    def test_parquet_round_trip(self):
+        """Test Parquet output reads back with blanks and leading zeros intact"""
+        drives = [
+            {'VPD Serial': '0012345', 'Health Score': 95, 'Grown Defects': 0, 'File Name': 'a.txt'},
+            {'VPD Serial': 'ABC', 'Health Score': None, 'Grown Defects': 3, 'File Name': 'b.txt'},
+        ]
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            parquet_path = os.path.join(temp_dir, 'out.parquet')
+            self.writer.write_parquet(drives, parquet_path)
+            df = self.writer.read_parquet(parquet_path)
+        
+        self.assertEqual(list(df.columns), self.writer.required_columns)
+        self.assertEqual(df['VPD Serial'].tolist(), ['0012345', 'ABC'])
+        self.assertEqual(df['Health Score'].tolist(), [95, ''])
+        self.assertEqual(df['Label Serial'].tolist(), ['', ''])
@@ -1,14 +1,21 @@
+import io
 import pytest
 import tempfile
 import os
-from django.test import TestCase, Client
-from django.core.files.uploadedfile import SimpleUploadedFile
+import zipfile
+from unittest import mock
+from kombu.exceptions import OperationalError as BrokerError
+from django.test import TestCase, Client, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
 from django.urls import reverse
-from reports.models import UploadBatch, ParseError
-from reports.services.collector import FileCollector
+from reports.models import UploadBatch, ParseError, ParsingJob
+from reports.services.collector import FileCollector, bulk_save_errors, save_upload
+from reports.services.excel import ExcelWriter
 from reports.services.parsers.txt_parser import TXTParser
 from reports.services.parsers.html_parser import HTMLParser
+from reports.services.parsers.pdf_parser import PDFParser
 from reports.services.vendor import derive_vendor
+from reports.tasks import requeue_pending_local_jobs
 
 
 class TestUploadLimits(TestCase):
@@ -50,6 +57,88 @@ class TestUploadLimits(TestCase):
             
         # Should have error about too many files
         self.assertTrue(any('exceeds limit of 50' in error['error_message'] for error in errors))
+    
+    def test_sniffed_type_is_returned(self):
+        """Test files with an unsupported extension carry their sniffed type"""
+        files = [
+            SimpleUploadedFile('report.htm', b'<html><body>x</body></html>', content_type='text/html'),
+            SimpleUploadedFile('report', b'Hard Disk Serial Number: X\n', content_type='text/plain'),
+        ]
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            collected_files, errors = self.collector.collect_files(files, temp_dir)
+        
+        self.assertEqual(errors, [])
+        self.assertEqual([file_type for _, file_type in collected_files], ['.html', '.txt'])
+    
+    def test_colliding_upload_names_kept_apart(self):
+        """Test uploads and zip members with the same name are saved separately"""
+        def zipped(content):
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, 'w') as zf:
+                zf.writestr('report.txt', content)
+            return buffer.getvalue()
+        
+        files = [
+            SimpleUploadedFile('bundle.zip', zipped(b'first'), content_type='application/zip'),
+            SimpleUploadedFile('bundle.zip', zipped(b'second'), content_type='application/zip'),
+            SimpleUploadedFile('report.txt', b'third', content_type='text/plain'),
+            SimpleUploadedFile('report.txt', b'fourth', content_type='text/plain'),
+        ]
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            collected_files, errors = self.collector.collect_files(files, temp_dir)
+            contents = []
+            for file_path, _ in collected_files:
+                with open(file_path, 'rb') as f:
+                    contents.append(f.read())
+        
+        self.assertEqual(errors, [])
+        self.assertEqual(contents, [b'first', b'second', b'third', b'fourth'])
+    
+    def test_save_upload(self):
+        """Test that spooled uploads are moved and in-memory uploads copied"""
+        spooled = TemporaryUploadedFile('disk.txt', 'text/plain', 5, 'utf-8')
+        spooled.write(b'hello')
+        spooled.seek(0)
+        spooled_path = spooled.temporary_file_path()
+        in_memory = SimpleUploadedFile('memory.txt', b'world', content_type='text/plain')
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            disk_dest = save_upload(spooled, os.path.join(temp_dir, 'disk.txt'))
+            memory_dest = save_upload(in_memory, os.path.join(temp_dir, 'memory.txt'))
+            spooled.close()
+            
+            self.assertFalse(os.path.exists(spooled_path))
+            with open(disk_dest, 'rb') as f:
+                self.assertEqual(f.read(), b'hello')
+            with open(memory_dest, 'rb') as f:
+                self.assertEqual(f.read(), b'world')
+
+
+class TestBrokerFallback(TestCase):
+    """Test jobs submitted while the Celery broker is down"""
+    
+    def test_job_parked_and_requeued(self):
+        """Test a job is left PENDING_LOCAL and queued by requeue_pending_local_jobs"""
+        upload = SimpleUploadedFile('report.txt', b'Hard Disk Serial Number: X\n', content_type='text/plain')
+        
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            with mock.patch('reports.views.process_files_task.delay', side_effect=BrokerError('down')):
+                response = Client().post('/', {'files': upload})
+            
+            job = ParsingJob.objects.get()
+            self.assertRedirects(response, reverse('job_status', args=[job.id]), fetch_redirect_response=False)
+            self.assertEqual(job.status, 'PENDING_LOCAL')
+            self.assertEqual(len(job.input_paths), 1)
+            self.assertTrue(os.path.exists(job.input_paths[0]))
+            
+            with mock.patch('reports.tasks.process_files_task.delay') as delay:
+                requeue_pending_local_jobs()
+            
+            delay.assert_called_once_with(str(job.id), job.input_paths)
+            job.refresh_from_db()
+            self.assertEqual(job.status, 'PENDING')
 
 
 class TestTXTParser(TestCase):
@@ -161,6 +250,64 @@ class TestHTMLParser(TestCase):
         self.assertEqual(drive['Model Number'], 'WD Blue 1TB')
         self.assertTrue(drive['Vendor'] in ['Western Digital', 'Unknown'])
         self.assertEqual(drive['Health Score'], 95)
+    
+    def test_parse_large_html_streamed(self):
+        """Test that reports above the mmap threshold parse the same way"""
+        padding = '<p>Event log entry with nothing of interest</p>\n' * 8000
+        html_content = f"""
+        <html>
+        <body>
+        <p>Hard Disk Serial Number : WD-WCC4E1234567</p>
+        <p>Hard Disk Model ID : WDC WD10EZEX-08WN4A0</p>
+        <p>Health : 97 %</p>
+        {padding}
+        </body>
+        </html>
+        """
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False) as f:
+            f.write(html_content)
+        
+        try:
+            self.assertGreater(os.path.getsize(f.name), 256 * 1024)
+            drives = self.parser.parse(f.name, 'large.html')
+        finally:
+            os.unlink(f.name)
+        
+        self.assertEqual(drives[0]['VPD Serial'], 'WD-WCC4E1234567')
+        self.assertEqual(drives[0]['Model Number'], 'WDC WD10EZEX-08WN4A0')
+        self.assertEqual(drives[0]['Health Score'], 97)
+
+
+class TestPDFParser(TestCase):
+    """Test PDF text scanning"""
+    
+    def setUp(self):
+        self.parser = PDFParser()
+    
+    def test_pages_read_until_fields_found(self):
+        """Test that pages after the one completing the main fields are not extracted"""
+        pages = [
+            "Serial Number = ZA1234567890\nProduct = ST4000NM0035\n",
+            "\nHealth: 97 %\nNumber of Grown Defects = 3\n",
+            "\nSerial Number = ZB0000000000\n",
+        ]
+        read = []
+        
+        def iter_pages():
+            for page in pages:
+                read.append(page)
+                yield page
+        
+        fields = self.parser._SCANNER.extract_chunks(iter_pages(), self.parser._STOP_FIELDS)
+        row = self.parser._row_from_fields(fields, 'test.pdf')
+        
+        self.assertEqual(len(read), 2)
+        self.assertEqual(row['VPD Serial'], 'ZA1234567890')
+        self.assertEqual(row['Model Number'], 'ST4000NM0035')
+        self.assertEqual(row['Health Score'], 97)
+        self.assertEqual(row['Grown Defects'], 3)
+        self.assertEqual(fields, self.parser._SCANNER.extract("".join(pages[:2])))
 
 
 class TestDedupAndErrors(TestCase):
@@ -221,6 +368,55 @@ class TestDedupAndErrors(TestCase):
         
         self.assertEqual(len(unique_drives), 2)
         self.assertEqual(unique_drives[1]['Parsing Error'], 'Could not parse serial')
+    
+    def test_deduplicate_dataframe(self):
+        """Test deduplication of a drives DataFrame"""
+        drives = [
+            {'VPD Serial': 'WD12345678901234567890', 'Health Score': 95, 'File Name': 'file1.txt'},
+            {'VPD Serial': '', 'Health Score': 0, 'File Name': 'file2.txt'},
+            {'VPD Serial': 'WD12345678901234567890', 'Health Score': 90, 'File Name': 'file3.txt'},
+            {'VPD Serial': '', 'Health Score': 0, 'File Name': 'file4.txt'},
+        ]
+        df = ExcelWriter().create_dataframe(drives)
+        
+        unique_df = self.collector.deduplicate_drives(df)
+        
+        self.assertEqual(list(unique_df['File Name']), ['file1.txt', 'file2.txt', 'file4.txt'])
+        self.assertEqual(unique_df.iloc[0]['Health Score'], 95)
+    
+    def test_bulk_save_errors(self):
+        """Test that collected errors are persisted for the job"""
+        job = ParsingJob.objects.create(uploaded_files=['a.txt', 'b.txt'])
+        errors = [
+            {
+                'file_name': 'a.txt',
+                'error_message': 'Could not parse file',
+                'encodings_tried': ['utf-8', 'iso-8859-1']
+            },
+            {
+                'file_name': 'b.txt',
+                'error_message': 'Empty file',
+                'encodings_tried': []
+            }
+        ]
+        
+        self.assertEqual(bulk_save_errors(job, errors), 2)
+        
+        self.assertEqual(job.errors.count(), 2)
+        saved = job.errors.get(file_name='a.txt')
+        self.assertEqual(saved.encodings_tried, ['utf-8', 'iso-8859-1'])
+        self.assertEqual(bulk_save_errors(job, []), 0)
+    
+    def test_bulk_save_errors_for_batch(self):
+        """Test that legacy upload batches get their errors in one call"""
+        batch = UploadBatch.objects.create(original_names=['c.txt'], total_reports=1, total_drives=0)
+        errors = [{'file_name': 'c.txt', 'error_message': 'Empty file', 'encodings_tried': []}]
+        
+        self.assertEqual(bulk_save_errors(None, errors, batch=batch), 1)
+        
+        saved = batch.errors.get()
+        self.assertEqual(saved.file_name, 'c.txt')
+        self.assertIsNone(saved.job)
 
 
 class TestVendorDerivation(TestCase):
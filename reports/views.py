@@ -1,20 +1,26 @@
 import os
+import secrets
 import tempfile
 import logging
+from kombu.exceptions import OperationalError as BrokerError
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import HttpResponse, Http404, JsonResponse
+from django.http import FileResponse, Http404, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import require_http_methods, condition
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 from django.conf import settings
-from pathlib import Path
-from .models import UploadBatch, ParseError, ParsingJob
-from .services import FileCollector, ExcelWriter, HTMLParser, TXTParser, PDFParser
-from .tasks import process_files_task
+from django.core.cache import cache
+from django.db import transaction
+from .models import UploadBatch, ParsingJob
+from .services import FileCollector, ExcelWriter, bulk_save_errors, save_upload, parse_many
+from .tasks import process_files_task, job_status_cache_key
 
 logger = logging.getLogger(__name__)
 
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
 
 def upload_view(request):
     """Display upload form"""
@@ -47,10 +53,8 @@ def submit_parsing_job(request, uploaded_files):
             file_names.append(file_name)
             
             # Save file
-            file_path = os.path.join(upload_dir, f"{os.urandom(8).hex()}_{file_name}")
-            with open(file_path, 'wb+') as destination:
-                for chunk in uploaded_file.chunks():
-                    destination.write(chunk)
+            file_path = os.path.join(upload_dir, f"{secrets.token_hex(8)}_{file_name}")
+            save_upload(uploaded_file, file_path)
             file_paths.append(file_path)
         
         # Create job record
@@ -60,24 +64,36 @@ def submit_parsing_job(request, uploaded_files):
             total_files=len(file_names)
         )
         
-        # Submit task to Celery
-        process_files_task.delay(str(job.id), file_paths)
-        
-        logger.info(f"Submitted job {job.id} with {len(file_names)} files")
+        # Submit task to Celery; if the broker is down, park the job for
+        # requeue_pending_local_jobs to queue once the broker is back
+        try:
+            process_files_task.delay(str(job.id), file_paths)
+            logger.info(f"Submitted job {job.id} with {len(file_names)} files")
+        except BrokerError as e:
+            logger.warning(f"Broker unavailable, job {job.id} left PENDING_LOCAL for requeue: {e}")
+            job.status = 'PENDING_LOCAL'
+            job.input_paths = file_paths
+            job.save(update_fields=['status', 'input_paths'])
         
         # Redirect to job status page
         return redirect('job_status', job_id=job.id)
         
-    except Exception as e:
-        logger.error(f"Error submitting job: {e}")
+    except Exception:
+        # Full traceback to the log; the page only gets a short message
+        logger.exception("Error submitting job")
         return render(request, 'reports/upload.html', {
-            'error_message': f'Failed to submit job: {str(e)}'
+            'error_message': 'Failed to submit job; please retry.'
         })
 
 
 def job_list_view(request):
     """Display list of all parsing jobs"""
-    jobs = ParsingJob.objects.all()[:50]  # Last 50 jobs
+    # Last 50 jobs, fetching only the columns the list renders (not error_message
+    # or result file paths); uploaded_files is shown, so it must be loaded too
+    jobs = ParsingJob.objects.only(
+        'id', 'status', 'created_at', 'uploaded_files',
+        'total_files', 'total_drives', 'duplicates_removed',
+    ).order_by('-created_at')[:50]
     
     context = {
         'jobs': jobs
@@ -99,29 +115,62 @@ def job_status_view(request, job_id):
     return render(request, 'reports/job_status.html', context)
 
 
+# Columns job_status_api reports (and builds its ETag from)
+JOB_STATUS_FIELDS = ('id', 'status', 'created_at', 'completed_at', 'total_files',
+                     'total_drives', 'duplicates_removed', 'error_message')
+
+
+def _job_status(job_id):
+    """
+    The polled job columns as a dict, or None for an unknown job.
+    Cached for a second so every tab polling the same job shares one query;
+    the task clears the entry whenever it saves the job. Both only reach
+    other processes with a shared cache (CACHE_URL); with the local-memory
+    fallback each web process caches on its own and the timeout bounds staleness.
+    """
+    return cache.get_or_set(
+        job_status_cache_key(job_id),
+        lambda: ParsingJob.objects.filter(id=job_id).values(*JOB_STATUS_FIELDS).first(),
+        timeout=1,
+    )
+
+
+def _job_status_etag(request, job_id):
+    """
+    ETag for job_status_api, from the fields a running job updates.
+    Polls that find nothing changed get a 304 without the JSON.
+    """
+    state = _job_status(job_id)
+    if state is None:
+        return None
+    return ':'.join(str(state[field]) for field in
+                    ('id', 'status', 'completed_at', 'total_files', 'total_drives', 'duplicates_removed'))
+
+
+# no-cache: the browser keeps the last response but revalidates it on every poll
+@cache_control(no_cache=True)
+@condition(etag_func=_job_status_etag)
 def job_status_api(request, job_id):
     """API endpoint to check job status (for polling)"""
-    try:
-        job = ParsingJob.objects.get(id=job_id)
-        
-        data = {
-            'id': str(job.id),
-            'status': job.status,
-            'created_at': job.created_at.isoformat(),
-            'total_files': job.total_files,
-            'total_drives': job.total_drives,
-            'duplicates_removed': job.duplicates_removed,
-            'error_message': job.error_message
-        }
-        
-        if job.status == 'COMPLETED':
-            data['result_excel_url'] = f"/reports/download/{job.id}/?type=xlsx"
-            data['result_csv_url'] = f"/reports/download/{job.id}/?type=csv"
-        
-        return JsonResponse(data)
-    
-    except ParsingJob.DoesNotExist:
+    state = _job_status(job_id)
+    if state is None:
         return JsonResponse({'error': 'Job not found'}, status=404)
+    
+    data = {
+        'id': str(state['id']),
+        'status': state['status'],
+        'created_at': state['created_at'].isoformat(),
+        'total_files': state['total_files'],
+        'total_drives': state['total_drives'],
+        'duplicates_removed': state['duplicates_removed'],
+        'error_message': state['error_message']
+    }
+    
+    if state['status'] == 'COMPLETED':
+        data['result_excel_url'] = f"/reports/download/{state['id']}/?type=xlsx"
+        data['result_csv_url'] = f"/reports/download/{state['id']}/?type=csv"
+    
+    return JsonResponse(data)
 
 
 def download_job_result(request, job_id):
@@ -134,31 +183,61 @@ def download_job_result(request, job_id):
     file_type = request.GET.get('type', 'xlsx')
     
     if file_type == 'xlsx' and job.result_excel:
-        file_path = job.result_excel.path
-        filename = os.path.basename(file_path)
-        
-        if os.path.exists(file_path):
-            with open(file_path, 'rb') as f:
-                response = HttpResponse(
-                    f.read(), 
-                    content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                )
-                response['Content-Disposition'] = f'attachment; filename="{filename}"'
-                return response
+        return _file_download(job.result_excel.path, XLSX_CONTENT_TYPE)
     
-    elif file_type == 'csv' and job.result_csv:
-        file_path = job.result_csv.path
-        filename = os.path.basename(file_path)
-        
-        if os.path.exists(file_path):
-            with open(file_path, 'rb') as f:
-                response = HttpResponse(f.read(), content_type='text/csv')
-                response['Content-Disposition'] = f'attachment; filename="{filename}"'
-                return response
+    elif file_type == 'csv' and (job.result_csv or job.result_excel):
+        return _file_download(_job_csv_path(job), 'text/csv')
     
     raise Http404("File not found")
 
 
+def _file_download(file_path, content_type):
+    """
+    Stream a result file as an attachment.
+    FileResponse sends it in blocks (or via wsgi.file_wrapper / sendfile where
+    the server supports it) instead of reading the whole file into memory.
+    """
+    try:
+        f = open(file_path, 'rb')
+    except FileNotFoundError:
+        raise Http404("File not found")
+    # FileResponse closes the file once the response has been sent
+    return FileResponse(f, as_attachment=True, filename=os.path.basename(file_path),
+                        content_type=content_type)
+
+
+def _job_csv_path(job):
+    """
+    Return the job's CSV path, generating it on first request from the
+    Parquet drives (or the Excel result for older jobs). The CSV is cached on the job once built.
+    """
+    if job.result_csv and (os.path.exists(job.result_csv.path) or not job.result_excel):
+        return job.result_csv.path
+    
+    excel_path = job.result_excel.path
+    csv_path = os.path.splitext(excel_path)[0] + '.csv'
+    if os.path.exists(excel_path) and not os.path.exists(csv_path):
+        # Write under a temporary name so concurrent downloads never see a partial file
+        fd, tmp_path = tempfile.mkstemp(suffix='.csv', dir=os.path.dirname(csv_path))
+        os.close(fd)
+        try:
+            excel_writer = ExcelWriter()
+            if job.result_parquet and os.path.exists(job.result_parquet.path):
+                excel_writer.write_csv(excel_writer.read_parquet(job.result_parquet.path), tmp_path)
+            else:
+                excel_writer.excel_to_csv(excel_path, tmp_path)
+            os.replace(tmp_path, csv_path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        logger.info(f"Generated CSV for job {job.id}")
+    
+    if os.path.exists(csv_path):
+        job.result_csv = os.path.splitext(job.result_excel.name)[0] + '.csv'
+        job.save(update_fields=['result_csv'])
+    return csv_path
+
+
 # Legacy views (keep for backward compatibility if needed)
 def parse_files(request, uploaded_files):
     """Process uploaded files and generate reports (LEGACY - synchronous)"""
@@ -178,42 +257,27 @@ def parse_files(request, uploaded_files):
                     'duplicates_removed': 0
                 })
             
-            # Parse files
+            # Parse files across a small process pool (serially for a single file).
+            # This runs inside a gunicorn worker, so the pool is capped per request
             all_drives = []
             parse_errors = []
             
-            for file_path in collected_files:
-                try:
-                    file_name = os.path.basename(file_path)
-                    file_ext = Path(file_path).suffix.lower()
-                    
-                    # Choose parser based on file extension
-                    if file_ext == '.html':
-                        parser = HTMLParser()
-                    elif file_ext == '.txt':
-                        parser = TXTParser()
-                    elif file_ext == '.pdf':
-                        parser = PDFParser()
-                    else:
-                        logger.warning(f"Unknown file extension: {file_ext}")
-                        continue
-                    
-                    # Parse file
-                    drives = parser.parse(file_path, file_name)
-                    all_drives.extend(drives)
-                    
-                except Exception as e:
-                    logger.error(f"Error parsing file {file_path}: {e}")
+            # Dispatch on the type the collector recognised, not the file name
+            pairs = [(file_path, os.path.basename(file_path), file_type) for file_path, file_type in collected_files]
+            for (file_path, file_name, _), (drives, error) in zip(pairs, parse_many(pairs, max_workers=settings.LEGACY_PARSE_MAX_WORKERS)):
+                if error is not None:
                     parse_errors.append({
-                        'file_name': os.path.basename(file_path),
-                        'error_message': str(e),
+                        'file_name': file_name,
+                        'error_message': error,
                         'encodings_tried': []
                     })
+                all_drives.extend(drives)
             
-            # Deduplicate drives
-            original_count = len(all_drives)
-            unique_drives = collector.deduplicate_drives(all_drives)
-            duplicates_removed = original_count - len(unique_drives)
+            # Build the export frame once and deduplicate it in place
+            excel_writer = ExcelWriter()
+            drives_df = excel_writer.create_dataframe(all_drives)
+            unique_drives = collector.deduplicate_drives(drives_df)
+            duplicates_removed = len(drives_df) - len(unique_drives)
             
             # Generate output files
             first_file_name = uploaded_files[0].name.split('.')[0] if uploaded_files else 'report'
@@ -227,28 +291,22 @@ def parse_files(request, uploaded_files):
             csv_path = os.path.join(output_dir, f"{output_base}.csv")
             
             # Write Excel file
-            excel_writer = ExcelWriter()
             excel_writer.write_excel(unique_drives, excel_path, parse_errors)
             
             # Write CSV file
             excel_writer.write_csv(unique_drives, csv_path)
             
-            # Create batch record
-            batch = UploadBatch.objects.create(
-                original_names=[f.name for f in uploaded_files],
-                result_file=excel_path,
-                total_reports=len(collected_files),
-                total_drives=len(unique_drives)
-            )
-            
-            # Save parse errors to database
-            for error in parse_errors:
-                ParseError.objects.create(
-                    batch=batch,
-                    file_name=error['file_name'],
-                    error_message=error['error_message'],
-                    encodings_tried=error['encodings_tried']
+            with transaction.atomic():
+                # Create batch record
+                batch = UploadBatch.objects.create(
+                    original_names=[f.name for f in uploaded_files],
+                    result_file=excel_path,
+                    total_reports=len(collected_files),
+                    total_drives=len(unique_drives)
                 )
+                
+                # Save parse errors to database in one batched insert
+                bulk_save_errors(None, parse_errors, batch=batch)
             
             return render(request, 'reports/result.html', {
                 'batch_id': batch.id,
@@ -276,13 +334,7 @@ def download_view(request, batch_id):
     file_type = request.GET.get('type', 'xlsx')
     
     if file_type == 'xlsx' and batch.result_file:
-        file_path = batch.result_file.path
-        filename = os.path.basename(file_path)
-        
-        with open(file_path, 'rb') as f:
-            response = HttpResponse(f.read(), content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            return response
+        return _file_download(batch.result_file.path, XLSX_CONTENT_TYPE)
     
     elif file_type == 'csv':
         # Generate CSV filename from Excel filename
@@ -290,10 +342,6 @@ def download_view(request, batch_id):
         csv_filename = excel_filename.replace('.xlsx', '.csv')
         csv_path = os.path.join(os.path.dirname(batch.result_file.path), csv_filename)
         
-        if os.path.exists(csv_path):
-            with open(csv_path, 'rb') as f:
-                response = HttpResponse(f.read(), content_type='text/csv')
-                response['Content-Disposition'] = f'attachment; filename="{csv_filename}"'
-                return response
+        return _file_download(csv_path, 'text/csv')
     
     raise Http404("File not found")